@@ -0,0 +1,282 @@
+"""
+Benchmark suite for the import, catalog, quiz, PDF and view paths.
+
+    python benchmark.py --scale 1 10 --out bench.json
+    python benchmark.py --scale 1 10 --baseline bench.json --threshold 0.25
+
+Each scale imports a catalog with import_csv into a temporary database: 1 is
+the real hanja.csv, larger scales repeat its rows (with numbered meanings so
+the search vocabulary grows too). Every path is run several times and the
+fastest and median runs are saved as JSON. With --baseline the run is
+compared to an earlier result and the exit status is 1 if any path got
+slower than the threshold allows. Views are built against a stand-in page,
+so no display is needed.
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from unittest import mock
+
+from hanja_core import QUIZ_MODES, ListSession, Sampler, StudyEngine
+from hanja_core.meaning_parser import MeaningParseError, parse_meaning_data
+from init_db import CSV_PATH, create_tables, import_csv, parse_meaning
+
+DEFAULT_SCALES = (1, 10)
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.25
+
+# Slowdowns smaller than this are noise, whatever the ratio
+MIN_REGRESSION_MS = 0.05
+
+# Filters timed on the list path: (grade, query)
+LIST_FILTERS = (("", ""), ("", "물"), ("8급", ""), ("3급", "수"), ("", "水"),
+                ("", "ㄱ"), ("", "ㄱㅇ"), ("3급", "무ㄹ"), ("", "mul"))
+# Radical/stroke browse filters: (grade, radical, total strokes)
+LIST_BROWSE = (("", "水", None), ("3급", "", 9), ("", "木", 8))
+LIST_PAGES = 10
+SAMPLE_GRADES = ("", "8급", "특급")
+PDF_COUNTS = (10, 50, 200)
+VIEWS = {"list": "한자 목록", "flashcard": "플래시카드", "quiz": "퀴즈", "practice": "쓰기 연습"}
+
+
+def synthesize_csv(src, dest, scale):
+    """Write src repeated scale times, numbering the meanings of each copy."""
+    with open(src, encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        fields = reader.fieldnames
+        rows = list(reader)
+    with open(dest, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fields)
+        writer.writeheader()
+        for copy in range(scale):
+            for row in rows:
+                if copy:
+                    row = dict(row, meaning=_numbered(row['meaning'], copy))
+                writer.writerow(row)
+
+
+def _numbered(meaning, copy):
+    """Append copy to every meaning of a CSV meaning field."""
+    try:
+        groups = parse_meaning_data(meaning)
+    except MeaningParseError:
+        return meaning
+    return repr([[[f"{m}{copy}" for m in meanings], list(sounds)]
+                 for meanings, sounds in groups])
+
+
+def measure(run, setup=None, repeat=DEFAULT_REPEAT):
+    """Time run(setup()) repeat times after one warm-up; return milliseconds."""
+    times = []
+    for i in range(repeat + 1):
+        arg = setup() if setup else None
+        started = time.perf_counter()
+        run(arg)
+        elapsed = (time.perf_counter() - started) * 1000
+        if i:
+            times.append(elapsed)
+    return {
+        'min_ms': round(min(times), 3),
+        'median_ms': round(statistics.median(times), 3),
+        'runs': repeat,
+    }
+
+
+def import_cases(csv_path, db_path, scale):
+    """parse_meaning over every row and a full import_csv into db_path."""
+    with open(csv_path, encoding='utf-8') as f:
+        meanings = [row['meaning'] for row in csv.DictReader(f)]
+
+    def fresh_db(_=None):
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        conn = sqlite3.connect(db_path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            create_tables(conn)
+        return conn
+
+    def run_import(conn):
+        with contextlib.redirect_stdout(io.StringIO()):
+            import_csv(conn, csv_path)
+        conn.close()
+
+    # Imports grow with the catalog, so larger scales are run fewer times
+    heavy = max(1, DEFAULT_REPEAT // scale)
+    yield 'parse_meaning', lambda _: [parse_meaning(m) for m in meanings], None, None
+    yield 'import_csv', run_import, fresh_db, heavy
+
+
+def catalog_cases(engine, out_dir):
+    """Catalog load, list filtering and paging, sampling, quizzes and PDFs."""
+    from hanja_core import HanjaCatalog, worksheet
+
+    worksheet.register_cjk_font()
+    catalog = engine.catalog
+    yield 'catalog.load', lambda _: HanjaCatalog.load(engine.db_path), None, None
+    for grade, query in LIST_FILTERS:
+        label = f"{grade or '전체'},{query or '-'}"
+        yield f'list.filter[{label}]', lambda _, g=grade, q=query: catalog.filter(g, q), None, None
+        yield (f'list.preview[{label}]',
+               lambda _, g=grade, q=query: catalog.preview(g, q), None, None)
+
+    for grade, radical, strokes in LIST_BROWSE:
+        label = f"{grade or '전체'},{radical or '-'},{strokes or '-'}"
+        yield (f'list.browse[{label}]',
+               lambda _, g=grade, r=radical, n=strokes: catalog.browse(g, r, n), None, None)
+
+    def page_through(session):
+        for _ in range(LIST_PAGES):
+            if not session.next_page():
+                break
+
+    def paged_session(_=None):
+        session = ListSession(catalog)
+        session.load("", "")
+        return session
+
+    yield f'list.next_page[x{LIST_PAGES}]', page_through, paged_session, None
+    sampler = Sampler(catalog, 0)
+    for grade in SAMPLE_GRADES:
+        yield (f"sample[{grade or '전체'}]",
+               lambda _, g=grade: sampler.sample(g, 20), None, None)
+    builder = engine.quiz_builder(0)
+    for mode in QUIZ_MODES:
+        yield f'quiz.build[{mode}]', lambda _, m=mode: builder.build("", 10, m), None, None
+    path = os.path.join(out_dir, 'bench.pdf')
+    for count in PDF_COUNTS:
+        yield (f'pdf[{count}]',
+               lambda _, n=count: worksheet.random_worksheet(path, sampler, "", n), None, None)
+
+
+def view_cases(engine):
+    """Build each desktop view on a stand-in page."""
+    import desktop_app
+
+    desktop_app.engine = engine
+
+    def navigate_from_home(_=None):
+        page = mock.MagicMock()
+        page.web = False
+        # No warm-up thread: it would compete with the timed builds
+        with mock.patch.object(desktop_app.threading, 'Thread'):
+            desktop_app.main(page)
+        navbar = page.add.call_args[0][0].controls[0]
+        return {button.text: button for button in navbar.content.controls[1].controls}
+
+    for view, label in VIEWS.items():
+        yield (f'view[{view}]',
+               lambda buttons, label=label: buttons[label].on_click(None),
+               navigate_from_home, None)
+
+
+def run_scale(scale, csv_path, repeat, only, work_dir):
+    """Run every case against one catalog scale; return {name: timings}."""
+    if scale > 1:
+        scaled = os.path.join(work_dir, f'hanja_x{scale}.csv')
+        synthesize_csv(csv_path, scaled, scale)
+        csv_path = scaled
+    db_path = os.path.join(work_dir, f'hanja_x{scale}.sqlite3')
+    results = {}
+
+    def run_cases(cases):
+        for name, run, setup, times in cases:
+            if only and not any(part in name for part in only):
+                continue
+            results[f'x{scale}/{name}'] = timing = measure(run, setup, times or repeat)
+            print(f"  {name}: {timing['median_ms']:.3f}ms (최소 {timing['min_ms']:.3f}ms)")
+            sys.stdout.flush()
+
+    print(f"\n[x{scale}] {csv_path}")
+    run_cases(import_cases(csv_path, db_path, scale))
+    if not os.path.exists(db_path):
+        # Filtered out above; later cases still need a catalog
+        with contextlib.redirect_stdout(io.StringIO()):
+            conn = sqlite3.connect(db_path)
+            create_tables(conn)
+            import_csv(conn, csv_path)
+            conn.close()
+    engine = StudyEngine(db_path, 0)
+    try:
+        run_cases(catalog_cases(engine, work_dir))
+        import flet as ft
+        # Controls of the stand-in page are detached and cannot send updates
+        with mock.patch.object(ft.Control, 'update'):
+            run_cases(view_cases(engine))
+    finally:
+        engine.close()
+    return results
+
+
+def compare(baseline, results, threshold):
+    """Print the change of every path against a baseline; return the regressions."""
+    regressions = []
+    print(f"\n기준 대비 변화 (허용 {threshold:.0%}, 최소 실행 시간 기준):")
+    for name, timing in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"  {name}: 새 항목")
+            continue
+        old, new = before['min_ms'], timing['min_ms']
+        change = (new - old) / old if old else 0.0
+        regressed = change > threshold and new - old > MIN_REGRESSION_MS
+        mark = "  ❌" if regressed else ""
+        print(f"  {name}: {old:.3f}ms → {new:.3f}ms ({change:+.0%}){mark}")
+        if regressed:
+            regressions.append(name)
+    skipped = len(baseline.keys() - results.keys())
+    if skipped:
+        print(f"  (기준에만 있는 항목 {skipped}개는 건너뜀)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="한자 학습 앱 벤치마크")
+    parser.add_argument('--scale', type=int, nargs='+', default=list(DEFAULT_SCALES),
+                        help="카탈로그 배율 (1 = hanja.csv 그대로, 예: 1 10 100)")
+    parser.add_argument('--csv', default=CSV_PATH, help="기준 CSV 파일 경로")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="항목당 반복 횟수")
+    parser.add_argument('--only', nargs='+', default=None,
+                        help="이름에 이 문자열이 들어간 항목만 실행 (예: list pdf)")
+    parser.add_argument('--out', default=None, help="결과 JSON 저장 경로")
+    parser.add_argument('--baseline', default=None, help="비교할 이전 결과 JSON")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="허용 느려짐 비율 (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='hanja-bench-') as work_dir:
+        for scale in args.scale:
+            results.update(run_scale(scale, args.csv, args.repeat, args.only, work_dir))
+
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.out}")
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(baseline, results, args.threshold)
+        if regressions:
+            print(f"\n성능 저하 {len(regressions)}건: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\n성능 저하 없음")
+
+
+if __name__ == "__main__":
+    main()
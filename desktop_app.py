@@ -2,24 +2,90 @@
 한자 학습 데스크톱 애플리케이션
 Flet 기반 전국한자능력검정시험 대비용 한자 학습 앱
 """
+import startup_profile  # first, so --profile-startup can time the imports below
+import argparse
+import asyncio
 import flet as ft
-import sqlite3
-import random
 import os
-import io
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
 from datetime import datetime
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.cidfonts import UnicodeCIDFont
-from reportlab.lib.units import mm
+
+from hanja_core import DEFAULT_DB_PATH, QUIZ_MODES, StudyEngine, instrument
+
+def user_database():
+    """Path of the database the app reads the catalog from and records answers in.
+
+    MAKING_HANJA_DB_PATH when set, else the project's database. A packaged
+    build unpacks its bundled database into a temporary folder, so there it
+    is copied once into a per-user data folder where answers persist.
+    """
+    if 'MAKING_HANJA_DB_PATH' in os.environ or not getattr(sys, 'frozen', False):
+        return DEFAULT_DB_PATH
+    if sys.platform == 'win32':
+        data_dir = os.environ.get('APPDATA') or os.path.expanduser('~')
+    elif sys.platform == 'darwin':
+        data_dir = os.path.expanduser('~/Library/Application Support')
+    else:
+        data_dir = os.environ.get('XDG_DATA_HOME') or os.path.expanduser('~/.local/share')
+    path = os.path.join(data_dir, 'making_hanja', 'making_hanja.sqlite3')
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        bundled = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'making_hanja.sqlite3')
+        shutil.copyfile(bundled, path + '.part')
+        os.replace(path + '.part', path)
+    return path
+
 
 # Database path
-DATABASE = os.path.join(os.path.dirname(__file__), 'making_hanja.sqlite3')
+DATABASE = user_database()
+
+# Optional seed for reproducible flashcard, quiz and worksheet draws
+SEED = os.environ.get('MAKING_HANJA_SEED')
+
+# Learner whose answers are recorded in progress and review_state
+CLIENT_ID = os.environ.get('MAKING_HANJA_CLIENT_ID', 'desktop')
+
+# Web mode: each browser keeps its own learner id in client storage
+WEB_CLIENT_KEY = "making_hanja.client_id"
+DEFAULT_WEB_PORT = 8550
+
+# Options shown per quiz question
+QUIZ_OPTION_COUNT = 4
+
+# Where flashcards and quizzes draw from: random hanja or the due review deck
+DECK_MODES = {'random': "무작위", 'review': "복습"}
+REVIEW_DECK_SIZE = 20
+
+# Hanja per page of the list view
+PER_PAGE = 20
+
+# Worksheet sizes offered in the practice view
+PRACTICE_COUNTS = [10, 30, 50, 100]
+
+# Whole-grade workbooks are saved in files of this many pages: reportlab
+# keeps a file's pages in memory until it is saved
+WORKBOOK_VOLUME_PAGES = 100
 
-# Register CJK font for PDF
-pdfmetrics.registerFont(UnicodeCIDFont('HYSMyeongJo-Medium'))
-CJK_FONT = 'HYSMyeongJo-Medium'
+# Worksheet progress: most frequent bar update, in seconds, besides page changes
+PDF_PROGRESS_INTERVAL = 0.2
+
+# Search-as-you-type: pause after the last keystroke before searching
+SEARCH_DEBOUNCE = 0.25
+
+# Rows of the instrumentation panel: operations by total time, slow log entries
+STATS_ROWS = 30
+STATS_SLOW_ROWS = 15
+# Control events whose handlers are timed, per view, while instrumenting
+INSTRUMENTED_EVENTS = ('on_click', 'on_change', 'on_submit', 'on_scroll')
+
+# Virtualized list: fixed row height, rows built beyond each edge of the viewport
+SCROLL_ROW_HEIGHT = 64
+SCROLL_BUFFER = 20
 
 # Grade order for sorting
 GRADE_OPTIONS = [
@@ -29,11 +95,56 @@ GRADE_OPTIONS = [
 ]
 
 
-def get_db():
-    """Get database connection."""
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row
-    return conn
+# Catalog, connections and review schedulers shared by every view
+engine = StudyEngine(DATABASE, int(SEED) if SEED else None)
+
+
+def get_catalog():
+    """Get the shared in-memory catalog, loading it on first use."""
+    return engine.catalog
+
+
+def get_scheduler(client_id=CLIENT_ID):
+    """Get a learner's spaced-repetition scheduler, opening it on first use."""
+    return engine.scheduler(client_id)
+
+
+def instrument_handlers(view, control):
+    """Time the event handlers of a built view as ('handler', 'view.event[label]').
+
+    Views are built once and then changed by their handlers, so this is
+    where the cost of each interaction shows up.
+    """
+    stack = [control]
+    while stack:
+        control = stack.pop()
+        for event in INSTRUMENTED_EVENTS:
+            handler = getattr(control, event, None)
+            if callable(handler) and not hasattr(handler, '__wrapped__'):
+                label = (getattr(control, 'text', None) or getattr(control, 'label', None)
+                         or getattr(handler, '__name__', event))
+                setattr(control, event,
+                        instrument.timed('handler', f"{view}.{event}[{label}]")(handler))
+        content = getattr(control, 'content', None)
+        if isinstance(content, ft.Control):
+            stack.append(content)
+        stack.extend(c for c in getattr(control, 'controls', None) or () if isinstance(c, ft.Control))
+
+
+if instrument.ENABLED:
+    # Retained views send their changes through control.update()
+    ft.Control.update = instrument.timed('flet', 'control.update')(ft.Control.update)
+
+
+def session_client_id(page):
+    """Learner id of a session: CLIENT_ID on the desktop, one per browser on the web."""
+    if not page.web:
+        return CLIENT_ID
+    client_id = page.client_storage.get(WEB_CLIENT_KEY)
+    if not client_id:
+        client_id = f"web-{uuid.uuid4().hex[:12]}"
+        page.client_storage.set(WEB_CLIENT_KEY, client_id)
+    return client_id
 
 
 def main(page: ft.Page):
@@ -44,173 +155,93 @@ def main(page: ft.Page):
     page.window.height = 700
     page.padding = 0
     
-    # State variables
-    current_view = "home"
-    selected_grade = ""
-    hanja_list = []
-    current_page_num = 1
-    per_page = 20
-    total_count = 0
-    search_query = ""
+    # The engine is shared by every session; only what follows is per session
+    client_id = session_client_id(page)
     
-    # Flashcard state
-    flashcard_list = []
-    flashcard_index = 0
-    show_answer = False
+    def on_window_event(e):
+        """Commit queued answers before the window closes."""
+        if e.data == "close":
+            engine.close()
+            page.window.destroy()
     
-    # Quiz state
-    quiz_list = []
-    quiz_index = 0
-    quiz_score = 0
-    quiz_options = []
-    quiz_result = ""
+    if not page.web:
+        page.window.prevent_close = True
+        page.window.on_event = on_window_event
     
-    def load_hanja(grade="", query="", page_num=1):
-        """Load hanja list from database."""
-        nonlocal hanja_list, total_count, current_page_num
-        current_page_num = page_num
-        
-        db = get_db()
-        offset = (page_num - 1) * per_page
-        
-        conditions = []
-        params = []
-        
-        if grade and grade != "전체":
-            conditions.append("level = ?")
-            params.append(grade)
-        if query:
-            conditions.append("(hanja LIKE ? OR main_sound LIKE ? OR meaning LIKE ?)")
-            params.extend([f"%{query}%", f"%{query}%", f"%{query}%"])
-        
-        where_clause = " AND ".join(conditions) if conditions else "1=1"
-        
-        # Get total count
-        count_query = f"SELECT COUNT(*) as cnt FROM hanja WHERE {where_clause}"
-        total_count = db.execute(count_query, params).fetchone()['cnt']
-        
-        # Get page data
-        data_query = f"""
-            SELECT id, hanja, main_sound, meaning, level, radical, strokes, total_strokes
-            FROM hanja WHERE {where_clause}
-            ORDER BY level_order, main_sound
-            LIMIT ? OFFSET ?
-        """
-        params.extend([per_page, offset])
-        cursor = db.execute(data_query, params)
-        hanja_list = [dict(row) for row in cursor.fetchall()]
-        db.close()
+    if instrument.ENABLED:
+        page.update = instrument.timed('flet', 'page.update')(page.update)
     
-    def load_random_hanja(grade="", count=10):
-        """Load random hanja for flashcards/quiz."""
-        db = get_db()
-        
-        if grade and grade != "전체":
-            cursor = db.execute("""
-                SELECT id, hanja, main_sound, meaning, level
-                FROM hanja WHERE level = ?
-                ORDER BY RANDOM() LIMIT ?
-            """, [grade, count])
-        else:
-            cursor = db.execute("""
-                SELECT id, hanja, main_sound, meaning, level
-                FROM hanja ORDER BY RANDOM() LIMIT ?
-            """, [count])
-        
-        result = [dict(row) for row in cursor.fetchall()]
-        db.close()
-        return result
+    # Built on first use (or by warm_up); every view reads from memory
+    quiz_builder = None
+    session_lock = threading.Lock()
     
-    def get_quiz_options(correct_meaning, count=4):
-        """Get quiz options including the correct answer."""
-        db = get_db()
-        cursor = db.execute("""
-            SELECT DISTINCT meaning FROM hanja
-            WHERE meaning != ?
-            ORDER BY RANDOM() LIMIT ?
-        """, [correct_meaning, count - 1])
-        options = [row['meaning'] for row in cursor.fetchall()]
-        db.close()
-        options.append(correct_meaning)
-        random.shuffle(options)
-        return options
+    current_view = "home"
     
-    def generate_pdf(grade="", count=10, repeat=10):
-        """Generate practice PDF."""
-        hanja_data = load_random_hanja(grade, count)
-        
-        if not hanja_data:
-            return None
-        
-        buffer = io.BytesIO()
-        c = canvas.Canvas(buffer, pagesize=A4)
-        width, height = A4
-        
-        # Title
-        c.setFont(CJK_FONT, 16)
-        today = datetime.now().strftime("%Y년 %m월 %d일")
-        grade_text = f" ({grade})" if grade and grade != "전체" else ""
-        c.drawCentredString(width / 2, height - 30 * mm, f"일일 한자 쓰기 연습{grade_text}")
-        c.setFont(CJK_FONT, 10)
-        c.drawCentredString(width / 2, height - 38 * mm, today)
-        
-        # Settings for grid
-        start_y = height - 55 * mm
-        left_margin = 15 * mm
-        cell_size = 18 * mm
-        info_width = 55 * mm
-        
-        for idx, hanja in enumerate(hanja_data):
-            row_y = start_y - (idx * (cell_size + 5 * mm))
-            
-            if row_y < 25 * mm:
-                c.showPage()
-                start_y = height - 25 * mm
-                row_y = start_y - ((idx % 10) * (cell_size + 5 * mm))
-            
-            c.setFont(CJK_FONT, 8)
-            c.drawString(left_margin, row_y + 12 * mm, f"[{hanja['level']}]")
-            
-            c.setFont(CJK_FONT, 28)
-            c.drawString(left_margin, row_y - 2 * mm, hanja['hanja'])
-            
-            c.setFont(CJK_FONT, 9)
-            c.drawString(left_margin + 22 * mm, row_y + 8 * mm, f"{hanja['main_sound']}")
-            
-            meaning_text = hanja['meaning'][:20] + "..." if len(hanja['meaning']) > 20 else hanja['meaning']
-            c.drawString(left_margin + 22 * mm, row_y, meaning_text)
-            
-            grid_start_x = left_margin + info_width
-            for i in range(repeat):
-                box_x = grid_start_x + (i * cell_size)
-                if box_x + cell_size > width - 10 * mm:
-                    break
-                c.setStrokeColorRGB(0.7, 0.7, 0.7)
-                c.setLineWidth(0.5)
-                c.rect(box_x, row_y - 3 * mm, cell_size - 2 * mm, cell_size - 2 * mm)
-                c.setStrokeColorRGB(0.85, 0.85, 0.85)
-                c.setDash(2, 2)
-                center_x = box_x + (cell_size - 2 * mm) / 2
-                center_y = row_y - 3 * mm + (cell_size - 2 * mm) / 2
-                c.line(box_x, center_y, box_x + cell_size - 2 * mm, center_y)
-                c.line(center_x, row_y - 3 * mm, center_x, row_y - 3 * mm + cell_size - 2 * mm)
-                c.setDash()
-        
-        c.setFont(CJK_FONT, 8)
-        c.setFillColorRGB(0.5, 0.5, 0.5)
-        c.drawCentredString(width / 2, 10 * mm, "한자 학습 - 전국한자능력검정시험 대비")
-        
-        c.save()
-        buffer.seek(0)
-        return buffer.getvalue()
+    def get_quiz_builder():
+        """Get the session's quiz builder (own sampler, shared pools), creating it on first use."""
+        nonlocal quiz_builder
+        with session_lock:
+            if quiz_builder is None:
+                quiz_builder = engine.quiz_builder()
+        return quiz_builder
+    
+    def warm_up():
+        """Load the catalog and the PDF stack after the home view is shown."""
+        get_quiz_builder()
+        startup_profile.mark("카탈로그 로드")
+        get_scheduler(client_id)
+        startup_profile.mark("학습 기록 준비")
+        from hanja_core import worksheet
+        worksheet.register_cjk_font()
+        startup_profile.mark("PDF 준비")
+        startup_profile.report()
+    
+    @instrument.timed('pdf')
+    def generate_pdf(path, grade="", count=10, layout="standard", progress=None, cancel=None):
+        """Render a practice PDF straight to path.
+        
+        progress(done, total, page_number) is called after each character.
+        Setting the cancel event stops rendering with PdfCancelled. Returns
+        False if there was nothing to draw.
+        """
+        from hanja_core import worksheet
+        return worksheet.random_worksheet(path, get_quiz_builder().sampler, grade, count, layout,
+                                          progress, cancel)
+    
+    @instrument.timed('pdf')
+    def generate_workbook(out_dir, grade="", layout="standard", progress=None, cancel=None):
+        """Render every character of a grade as a workbook with running heads and an index.
+        
+        The workbook is split into volumes of WORKBOOK_VOLUME_PAGES pages.
+        Returns the paths written, or [] if the grade has no characters.
+        """
+        from hanja_core import worksheet
+        catalog = get_catalog()
+        if not catalog.count((grade,)):
+            return []
+        files, _, _ = worksheet.build_workbook(catalog, out_dir, (grade,), layout,
+                                               WORKBOOK_VOLUME_PAGES, progress, cancel)
+        return [path for path, _ in files]
     
     # UI Components
+    # Each view is built once and keeps references to its mutable controls.
+    # Handlers change state, call the view's render function and send patches
+    # for only the controls it returns.
+    def show_view(view):
+        """Show a view, building it on first visit."""
+        nonlocal current_view
+        current_view = view
+        if view not in views:
+            views[view] = view_builders[view]()
+            if instrument.ENABLED:
+                instrument_handlers(view, views[view])
+        content_area.content = views[view]
+        content_area.update()
+    
     def create_navbar():
         """Create navigation bar."""
         def nav_click(e, view):
-            nonlocal current_view
-            current_view = view
-            update_content()
+            show_view(view)
         
         return ft.Container(
             content=ft.Row([
@@ -229,6 +260,9 @@ def main(page: ft.Page):
                                   style=ft.ButtonStyle(color=ft.Colors.WHITE)),
                     ft.TextButton("쓰기 연습", on_click=lambda e: nav_click(e, "practice"),
                                   style=ft.ButtonStyle(color=ft.Colors.WHITE)),
+                    ft.TextButton("성능", on_click=lambda e: nav_click(e, "stats"),
+                                  style=ft.ButtonStyle(color=ft.Colors.WHITE),
+                                  visible=instrument.ENABLED),
                 ], spacing=5),
             ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
             padding=ft.padding.symmetric(horizontal=20, vertical=10),
@@ -239,6 +273,7 @@ def main(page: ft.Page):
             ),
         )
     
+    @instrument.timed('view')
     def create_home_view():
         """Create home view."""
         return ft.Container(
@@ -261,9 +296,7 @@ def main(page: ft.Page):
     def create_feature_card(icon, title, desc, view):
         """Create a feature card."""
         def on_click(e):
-            nonlocal current_view
-            current_view = view
-            update_content()
+            show_view(view)
         
         return ft.Container(
             content=ft.Column([
@@ -290,311 +323,745 @@ def main(page: ft.Page):
             on_change=on_change_callback,
         )
     
+    def grade_value(e):
+        """Read a grade dropdown event as "" for 전체."""
+        return e.control.value if e.control.value != "전체" else ""
+    
+    def create_hanja_card(h):
+        """Create a hanja list card."""
+        return ft.Container(
+            content=ft.Column([
+                ft.Row([
+                    ft.Text(h['hanja'], size=36, weight=ft.FontWeight.BOLD, color="#667eea"),
+                    ft.Column([
+                        ft.Text(h['main_sound'], size=16, weight=ft.FontWeight.BOLD),
+                        ft.Text(h['short_meaning'], size=12, color="#666"),
+                    ], spacing=2),
+                ], spacing=15),
+                ft.Row([
+                    ft.Container(
+                        content=ft.Text(h['level'], size=10, color=ft.Colors.WHITE),
+                        bgcolor="#667eea",
+                        padding=ft.padding.symmetric(horizontal=8, vertical=2),
+                        border_radius=10,
+                    ),
+                    ft.Text(f"부수: {h['radical']} | 획수: {h['total_strokes']}", size=10, color="#999"),
+                ], spacing=10),
+            ], spacing=8),
+            padding=15,
+            bgcolor=ft.Colors.WHITE,
+            border_radius=10,
+            shadow=ft.BoxShadow(blur_radius=5, color="#00000010"),
+        )
+    
+    def create_scroll_row(h):
+        """Create a fixed-height row for the virtualized list."""
+        return ft.Container(
+            content=ft.Row([
+                ft.Text(h['hanja'], size=28, weight=ft.FontWeight.BOLD, color="#667eea", width=50),
+                ft.Column([
+                    ft.Text(h['main_sound'], size=14, weight=ft.FontWeight.BOLD),
+                    ft.Text(h['short_meaning'], size=12, color="#666"),
+                ], spacing=0, expand=True),
+                ft.Container(
+                    content=ft.Text(h['level'], size=10, color=ft.Colors.WHITE),
+                    bgcolor="#667eea",
+                    padding=ft.padding.symmetric(horizontal=8, vertical=2),
+                    border_radius=10,
+                ),
+                ft.Text(f"부수: {h['radical']} | 획수: {h['total_strokes']}", size=10, color="#999", width=110),
+            ], spacing=15),
+            height=SCROLL_ROW_HEIGHT,
+            padding=ft.padding.symmetric(horizontal=15),
+            bgcolor=ft.Colors.WHITE,
+            border=ft.border.only(bottom=ft.BorderSide(1, "#eeeeee")),
+        )
+    
+    @instrument.timed('view')
     def create_list_view():
         """Create hanja list view."""
-        nonlocal selected_grade, search_query
+        listing = engine.list_session(PER_PAGE)
+        scroll_mode = False
+        scroll_source = None
+        scroll_window = (0, 0)
+        scroll_rows = {}
+        search_generation = 0
+        
+        def apply_filter(query=None):
+            listing.load(query=query)
+            if scroll_mode:
+                reset_scroll_source()
+            page.update(*render_list())
         
         def on_grade_change(e):
-            nonlocal selected_grade
-            selected_grade = e.control.value if e.control.value != "전체" else ""
-            load_hanja(selected_grade, search_query, 1)
-            update_content()
+            listing.grade = grade_value(e)
+            apply_filter()
         
         def on_search(e):
-            nonlocal search_query
-            search_query = e.control.value
-            load_hanja(selected_grade, search_query, 1)
-            update_content()
+            nonlocal search_generation
+            search_generation += 1  # supersede any pending live search
+            apply_filter(e.control.value)
+        
+        async def on_search_change(e):
+            """Search as the user types.
+            
+            Waits for a pause in typing, runs the search off the UI thread,
+            shows the first matches and then the full result. A newer
+            keystroke bumps search_generation, so an older search's results
+            are dropped when they arrive.
+            """
+            nonlocal search_generation
+            search_generation += 1
+            generation = search_generation
+            await asyncio.sleep(SEARCH_DEBOUNCE)
+            if generation != search_generation:
+                return
+            query = e.control.value
+            loop = asyncio.get_running_loop()
+            if not scroll_mode:
+                preview = await loop.run_in_executor(None, listing.preview, query)
+                if generation != search_generation:
+                    return
+                page.update(*render_preview(preview))
+            await loop.run_in_executor(None, listing.results_for, query)
+            if generation != search_generation:
+                return
+            apply_filter(query)
+        
+        def on_radical_toggle(e):
+            if not radical_panel.content.controls:
+                radical_panel.content.controls = create_radical_rows()
+            radical_panel.visible = not radical_panel.visible
+            radical_panel.update()
+        
+        def on_radical_pick(radical):
+            listing.radical = radical
+            radical_panel.visible = False
+            apply_filter()
+        
+        def on_strokes_change(e):
+            listing.total_strokes = None if e.control.value == "전체" else int(e.control.value)
+            apply_filter()
+        
+        def on_clear_browse(e):
+            listing.radical = ""
+            listing.total_strokes = None
+            strokes_dropdown.value = "전체"
+            radical_panel.visible = False
+            apply_filter()
+        
+        def on_scroll_mode(e):
+            nonlocal scroll_mode
+            scroll_mode = e.control.value
+            if scroll_mode:
+                reset_scroll_source()
+            page.update(*render_list())
+        
+        def on_scroll(e):
+            first = int(e.pixels // SCROLL_ROW_HEIGHT)
+            visible = int(e.viewport_dimension // SCROLL_ROW_HEIGHT) + 1
+            if render_window(first, visible):
+                scroll_list.update()
         
         def on_prev_page(e):
-            if current_page_num > 1:
-                load_hanja(selected_grade, search_query, current_page_num - 1)
-                update_content()
+            if listing.prev_page():
+                page.update(*render_list())
         
         def on_next_page(e):
-            total_pages = (total_count + per_page - 1) // per_page
-            if current_page_num < total_pages:
-                load_hanja(selected_grade, search_query, current_page_num + 1)
-                update_content()
-        
-        load_hanja(selected_grade, search_query, current_page_num)
-        total_pages = max(1, (total_count + per_page - 1) // per_page)
-        
-        hanja_cards = []
-        for h in hanja_list:
-            card = ft.Container(
-                content=ft.Column([
-                    ft.Row([
-                        ft.Text(h['hanja'], size=36, weight=ft.FontWeight.BOLD, color="#667eea"),
-                        ft.Column([
-                            ft.Text(h['main_sound'], size=16, weight=ft.FontWeight.BOLD),
-                            ft.Text(h['meaning'][:30], size=12, color="#666"),
-                        ], spacing=2),
-                    ], spacing=15),
+            if listing.next_page():
+                page.update(*render_list())
+        
+        def on_jump_page(e):
+            try:
+                page_num = int(e.control.value)
+            except ValueError:
+                return
+            listing.load(page_num=page_num)
+            page.update(*render_list())
+        
+        total_text = ft.Text(color="#666")
+        radical_button = ft.OutlinedButton(on_click=on_radical_toggle)
+        strokes_dropdown = ft.Dropdown(
+            label="총획수",
+            options=[ft.dropdown.Option("전체")] + [
+                ft.dropdown.Option(str(n)) for n in listing.catalog.stroke_counts()],
+            value="전체",
+            width=110,
+            on_change=on_strokes_change,
+        )
+        clear_browse_button = ft.TextButton("필터 해제", on_click=on_clear_browse)
+        # Radical index: one row of radicals per radical stroke count, built on first open
+        radical_panel = ft.Container(
+            content=ft.Column(spacing=4, scroll=ft.ScrollMode.AUTO),
+            height=220,
+            padding=10,
+            bgcolor=ft.Colors.WHITE,
+            border_radius=10,
+            visible=False,
+        )
+        
+        def create_radical_rows():
+            """Radicals grouped by their own stroke count, as in a dictionary index."""
+            groups = {}
+            for radical, radical_strokes, count in listing.catalog.radicals():
+                groups.setdefault(radical_strokes, []).append((radical, count))
+            return [
+                ft.Row([
+                    ft.Text(f"{n}획", width=40, color="#666"),
                     ft.Row([
-                        ft.Container(
-                            content=ft.Text(h['level'], size=10, color=ft.Colors.WHITE),
-                            bgcolor="#667eea",
-                            padding=ft.padding.symmetric(horizontal=8, vertical=2),
-                            border_radius=10,
-                        ),
-                        ft.Text(f"부수: {h['radical']} | 획수: {h['total_strokes']}", size=10, color="#999"),
-                    ], spacing=10),
-                ], spacing=8),
-                padding=15,
-                bgcolor=ft.Colors.WHITE,
-                border_radius=10,
-                shadow=ft.BoxShadow(blur_radius=5, color="#00000010"),
-            )
-            hanja_cards.append(card)
+                        ft.TextButton(radical, tooltip=f"{count}자",
+                                      on_click=lambda e, r=radical: on_radical_pick(r))
+                        for radical, count in radicals
+                    ], wrap=True, spacing=0, expand=True),
+                ], vertical_alignment=ft.CrossAxisAlignment.START)
+                for n, radicals in groups.items()
+            ]
+        
+        cards_column = ft.Column(spacing=10, scroll=ft.ScrollMode.AUTO)
+        prev_button = ft.IconButton(ft.Icons.ARROW_BACK, on_click=on_prev_page)
+        page_text = ft.Text()
+        next_button = ft.IconButton(ft.Icons.ARROW_FORWARD, on_click=on_next_page)
+        paged_section = ft.Column([
+            ft.Container(
+                content=cards_column,
+                height=400,
+            ),
+            ft.Row([
+                prev_button,
+                page_text,
+                next_button,
+                ft.TextField(label="페이지 이동", width=100, on_submit=on_jump_page,
+                             keyboard_type=ft.KeyboardType.NUMBER),
+            ], alignment=ft.MainAxisAlignment.CENTER),
+        ], spacing=20)
+        # Spacers stand in for the rows outside the built window, so the
+        # scroll extent always covers every match
+        top_spacer = ft.Container(height=0)
+        bottom_spacer = ft.Container(height=0)
+        scroll_list = ft.ListView(height=460, spacing=0, on_scroll=on_scroll,
+                                  on_scroll_interval=50, visible=False)
+        
+        def reset_scroll_source():
+            """Point the virtualized list at the current filter, scrolled to the top."""
+            nonlocal scroll_source, scroll_window
+            scroll_source = listing.window()
+            scroll_rows.clear()
+            scroll_window = (0, 0)
+            render_window(0, 0, force=True)
+            if scroll_list.page:
+                scroll_list.scroll_to(offset=0)
+        
+        def render_window(first, visible, force=False):
+            """Build controls for the rows around first; return True if the window moved."""
+            nonlocal scroll_window
+            total = len(scroll_source)
+            start = max(0, first - SCROLL_BUFFER)
+            stop = min(total, first + visible + SCROLL_BUFFER)
+            if not force and scroll_window[0] <= start and stop <= scroll_window[1]:
+                return False
+            # Build a buffer's worth of slack on each side so the next
+            # scroll events reuse this window
+            start = max(0, start - SCROLL_BUFFER)
+            stop = min(total, stop + SCROLL_BUFFER)
+            built = {}
+            for offset, h in enumerate(scroll_source.rows(start, stop), start):
+                built[offset] = scroll_rows.get(offset) or create_scroll_row(h)
+            scroll_rows.clear()
+            scroll_rows.update(built)
+            top_spacer.height = start * SCROLL_ROW_HEIGHT
+            bottom_spacer.height = (total - stop) * SCROLL_ROW_HEIGHT
+            scroll_list.controls = [top_spacer, *built.values(), bottom_spacer]
+            scroll_window = (start, stop)
+            scroll_source.prefetch(stop)
+            return True
+        
+        def render_preview(rows):
+            """Show the first matches while the full search runs."""
+            cards_column.controls = [create_hanja_card(h) for h in rows]
+            total_text.value = "검색 중…"
+            return cards_column, total_text
+        
+        def render_list():
+            """Apply the list state to the controls; return the ones that changed."""
+            total_text.value = f"총 {listing.total}개"
+            if listing.radical and not listing.query:
+                total_text.value += " (나머지 획수 순)"
+            radical_button.text = f"부수: {listing.radical or '전체'}"
+            clear_browse_button.visible = bool(listing.radical or listing.total_strokes)
+            paged_section.visible = not scroll_mode
+            scroll_list.visible = scroll_mode
+            browse_controls = (radical_button, clear_browse_button, radical_panel)
+            if scroll_mode:
+                return total_text, paged_section, scroll_list, *browse_controls
+            cards_column.controls = [create_hanja_card(h) for h in listing.rows]
+            page_text.value = f"{listing.page_num} / {listing.total_pages} 페이지"
+            prev_button.disabled = listing.page_num <= 1
+            next_button.disabled = listing.page_num >= listing.total_pages
+            return (cards_column, total_text, page_text, prev_button, next_button,
+                    paged_section, scroll_list, *browse_controls)
+        
+        listing.load()
+        render_list()
         
         return ft.Container(
             content=ft.Column([
                 ft.Text("한자 목록", size=24, weight=ft.FontWeight.BOLD),
                 ft.Row([
                     create_grade_dropdown(on_grade_change),
-                    ft.TextField(label="검색", width=200, on_submit=on_search),
-                    ft.Text(f"총 {total_count}개", color="#666"),
+                    ft.TextField(label="검색", width=200, on_submit=on_search,
+                                 on_change=on_search_change, hint_text="음·뜻·초성·로마자"),
+                    total_text,
+                    ft.Switch(label="전체 스크롤", value=False, on_change=on_scroll_mode),
                 ], spacing=20),
-                ft.Container(
-                    content=ft.Column(hanja_cards, spacing=10, scroll=ft.ScrollMode.AUTO),
-                    height=400,
-                ),
-                ft.Row([
-                    ft.IconButton(ft.Icons.ARROW_BACK, on_click=on_prev_page,
-                                  disabled=current_page_num <= 1),
-                    ft.Text(f"{current_page_num} / {total_pages} 페이지"),
-                    ft.IconButton(ft.Icons.ARROW_FORWARD, on_click=on_next_page,
-                                  disabled=current_page_num >= total_pages),
-                ], alignment=ft.MainAxisAlignment.CENTER),
+                ft.Row([radical_button, strokes_dropdown, clear_browse_button], spacing=20),
+                radical_panel,
+                paged_section,
+                scroll_list,
             ], spacing=20),
             padding=30,
         )
     
+    @instrument.timed('view')
     def create_flashcard_view():
         """Create flashcard view."""
-        nonlocal flashcard_list, flashcard_index, show_answer, selected_grade
+        cards = engine.flashcard_session(get_quiz_builder(), client_id)
+        flashcard_grade = ""
+        flashcard_deck = "random"
         
         def on_grade_change(e):
-            nonlocal selected_grade
-            selected_grade = e.control.value if e.control.value != "전체" else ""
+            nonlocal flashcard_grade
+            flashcard_grade = grade_value(e)
+        
+        def on_deck_change(e):
+            nonlocal flashcard_deck
+            flashcard_deck = e.control.value
         
         def start_flashcards(e):
-            nonlocal flashcard_list, flashcard_index, show_answer
-            flashcard_list = load_random_hanja(selected_grade, 20)
-            flashcard_index = 0
-            show_answer = False
-            update_content()
+            count = REVIEW_DECK_SIZE if flashcard_deck == "review" else 20
+            if not cards.start(flashcard_grade, flashcard_deck, count):
+                show_snack_bar("지금 복습할 한자가 없습니다", ft.Colors.GREY)
+                return
+            page.update(*render_card())
         
         def toggle_answer(e):
-            nonlocal show_answer
-            show_answer = not show_answer
-            update_content()
+            cards.flip()
+            page.update(*render_answer())
         
         def next_card(e):
-            nonlocal flashcard_index, show_answer
-            if flashcard_index < len(flashcard_list) - 1:
-                flashcard_index += 1
-                show_answer = False
-                update_content()
+            if cards.move(1):
+                page.update(*render_card())
         
         def prev_card(e):
-            nonlocal flashcard_index, show_answer
-            if flashcard_index > 0:
-                flashcard_index -= 1
-                show_answer = False
-                update_content()
-        
-        content = [
-            ft.Text("플래시카드", size=24, weight=ft.FontWeight.BOLD),
-            ft.Row([
-                create_grade_dropdown(on_grade_change),
-                ft.ElevatedButton("시작", on_click=start_flashcards, bgcolor="#667eea", color=ft.Colors.WHITE),
-            ], spacing=20),
-        ]
+            if cards.move(-1):
+                page.update(*render_card())
         
-        if flashcard_list:
-            current = flashcard_list[flashcard_index]
-            card_content = [
-                ft.Text(f"{flashcard_index + 1} / {len(flashcard_list)}", color="#666"),
-                ft.Text(current['hanja'], size=80, weight=ft.FontWeight.BOLD, color="#667eea"),
-            ]
-            
-            if show_answer:
-                card_content.extend([
-                    ft.Text(current['main_sound'], size=28),
-                    ft.Text(current['meaning'], size=16, color="#666"),
-                    ft.Container(
-                        content=ft.Text(current['level'], size=12, color=ft.Colors.WHITE),
-                        bgcolor="#667eea",
-                        padding=ft.padding.symmetric(horizontal=10, vertical=4),
-                        border_radius=15,
-                    ),
-                ])
+        def grade_card(known):
+            """Record whether the learner knew the card and move on."""
+            if cards.grade(known):
+                page.update(*render_card())
             else:
-                card_content.append(ft.Text("클릭하여 정답 보기", color="#999"))
-            
-            card = ft.Container(
-                content=ft.Column(card_content, 
-                                  horizontal_alignment=ft.CrossAxisAlignment.CENTER, 
-                                  spacing=10),
-                padding=40,
-                bgcolor=ft.Colors.WHITE,
-                border_radius=20,
-                shadow=ft.BoxShadow(blur_radius=15, color="#00000020"),
-                on_click=toggle_answer,
-                width=400,
-                height=350,
-            )
-            
-            content.append(ft.Container(content=card, alignment=ft.alignment.center))
-            content.append(ft.Row([
-                ft.IconButton(ft.Icons.ARROW_BACK, on_click=prev_card, 
-                              disabled=flashcard_index <= 0, icon_size=30),
-                ft.IconButton(ft.Icons.ARROW_FORWARD, on_click=next_card,
-                              disabled=flashcard_index >= len(flashcard_list) - 1, icon_size=30),
-            ], alignment=ft.MainAxisAlignment.CENTER, spacing=50))
-        else:
-            content.append(ft.Text("시작 버튼을 클릭하세요", color="#666"))
+                page.update(*render_answer())
+                show_snack_bar("카드를 모두 확인했습니다", ft.Colors.GREEN)
+        
+        counter_text = ft.Text(color="#666")
+        hanja_text = ft.Text(size=80, weight=ft.FontWeight.BOLD, color="#667eea")
+        sound_text = ft.Text(size=28)
+        meaning_text = ft.Text(size=16, color="#666")
+        level_text = ft.Text(size=12, color=ft.Colors.WHITE)
+        answer_column = ft.Column([
+            sound_text,
+            meaning_text,
+            ft.Container(
+                content=level_text,
+                bgcolor="#667eea",
+                padding=ft.padding.symmetric(horizontal=10, vertical=4),
+                border_radius=15,
+            ),
+        ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=10)
+        hint_text = ft.Text("클릭하여 정답 보기", color="#999")
+        grade_row = ft.Row([
+            ft.OutlinedButton("몰라요", icon=ft.Icons.CLOSE, on_click=lambda e: grade_card(False)),
+            ft.ElevatedButton("알아요", icon=ft.Icons.CHECK, on_click=lambda e: grade_card(True),
+                              bgcolor="#667eea", color=ft.Colors.WHITE),
+        ], alignment=ft.MainAxisAlignment.CENTER, spacing=20)
+        prev_button = ft.IconButton(ft.Icons.ARROW_BACK, on_click=prev_card, icon_size=30)
+        next_button = ft.IconButton(ft.Icons.ARROW_FORWARD, on_click=next_card, icon_size=30)
+        card_section = ft.Column([
+            ft.Container(
+                content=ft.Container(
+                    content=ft.Column([counter_text, hanja_text, answer_column, hint_text],
+                                      horizontal_alignment=ft.CrossAxisAlignment.CENTER, 
+                                      spacing=10),
+                    padding=40,
+                    bgcolor=ft.Colors.WHITE,
+                    border_radius=20,
+                    shadow=ft.BoxShadow(blur_radius=15, color="#00000020"),
+                    on_click=toggle_answer,
+                    width=400,
+                    height=350,
+                ),
+                alignment=ft.alignment.center,
+            ),
+            grade_row,
+            ft.Row([prev_button, next_button], alignment=ft.MainAxisAlignment.CENTER, spacing=50),
+        ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=20)
+        placeholder = ft.Text("시작 버튼을 클릭하세요", color="#666")
+        
+        def render_answer():
+            """Show or hide the answer; return the controls that changed."""
+            answer_column.visible = cards.show_answer
+            hint_text.visible = not cards.show_answer
+            grade_row.visible = cards.show_answer and not cards.is_graded
+            return answer_column, hint_text, grade_row
+        
+        def render_card():
+            """Apply the current card to the controls; return the ones that changed."""
+            card_section.visible = bool(cards.cards)
+            placeholder.visible = not cards.cards
+            if not cards.cards:
+                return card_section, placeholder
+            current = cards.current
+            counter_text.value = f"{cards.index + 1} / {len(cards.cards)}"
+            hanja_text.value = current['hanja']
+            sound_text.value = current['main_sound']
+            meaning_text.value = current['meaning']
+            level_text.value = current['level']
+            prev_button.disabled = cards.index <= 0
+            next_button.disabled = cards.index >= len(cards.cards) - 1
+            render_answer()
+            return card_section, placeholder
+        
+        render_card()
         
         return ft.Container(
-            content=ft.Column(content, horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=20),
+            content=ft.Column([
+                ft.Text("플래시카드", size=24, weight=ft.FontWeight.BOLD),
+                ft.Row([
+                    create_grade_dropdown(on_grade_change),
+                    ft.Dropdown(
+                        label="출제 방식",
+                        options=[ft.dropdown.Option(key=deck, text=label)
+                                 for deck, label in DECK_MODES.items()],
+                        value=flashcard_deck,
+                        width=120,
+                        on_change=on_deck_change,
+                    ),
+                    ft.ElevatedButton("시작", on_click=start_flashcards, bgcolor="#667eea", color=ft.Colors.WHITE),
+                ], spacing=20),
+                card_section,
+                placeholder,
+            ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=20),
             padding=30,
         )
     
+    @instrument.timed('view')
     def create_quiz_view():
         """Create quiz view."""
-        nonlocal quiz_list, quiz_index, quiz_score, quiz_options, quiz_result, selected_grade
+        quiz = engine.quiz_session(get_quiz_builder(), client_id, QUIZ_OPTION_COUNT)
+        quiz_grade = ""
+        quiz_deck = "random"
         
         def on_grade_change(e):
-            nonlocal selected_grade
-            selected_grade = e.control.value if e.control.value != "전체" else ""
+            nonlocal quiz_grade
+            quiz_grade = grade_value(e)
+        
+        def on_deck_change(e):
+            nonlocal quiz_deck
+            quiz_deck = e.control.value
+        
+        def on_mode_change(e):
+            quiz.mode = e.control.value
         
         def start_quiz(e):
-            nonlocal quiz_list, quiz_index, quiz_score, quiz_options, quiz_result
-            quiz_list = load_random_hanja(selected_grade, 10)
-            quiz_index = 0
-            quiz_score = 0
-            quiz_result = ""
-            if quiz_list:
-                quiz_options = get_quiz_options(quiz_list[0]['meaning'])
-            update_content()
+            count = REVIEW_DECK_SIZE if quiz_deck == "review" else 10
+            if not quiz.start(quiz_grade, quiz_deck, count=count):
+                show_snack_bar("지금 복습할 한자가 없습니다", ft.Colors.GREY)
+                return
+            page.update(*render_quiz())
         
         def check_answer(answer):
-            nonlocal quiz_result, quiz_score
-            correct = quiz_list[quiz_index]['meaning']
-            if answer == correct:
-                quiz_result = "정답입니다! 🎉"
-                quiz_score += 1
-            else:
-                quiz_result = f"오답입니다. 정답: {correct}"
-            update_content()
+            quiz.answer(answer)
+            page.update(*render_answer())
         
         def next_question(e):
-            nonlocal quiz_index, quiz_result, quiz_options
-            quiz_index += 1
-            quiz_result = ""
-            if quiz_index < len(quiz_list):
-                quiz_options = get_quiz_options(quiz_list[quiz_index]['meaning'])
-            update_content()
-        
-        content = [
-            ft.Text("한자 퀴즈", size=24, weight=ft.FontWeight.BOLD),
-            ft.Row([
-                create_grade_dropdown(on_grade_change),
-                ft.ElevatedButton("시작", on_click=start_quiz, bgcolor="#667eea", color=ft.Colors.WHITE),
-            ], spacing=20),
+            quiz.next()
+            page.update(*render_quiz())
+        
+        counter_text = ft.Text(color="#666")
+        score_text = ft.Text(weight=ft.FontWeight.BOLD)
+        prompt_text = ft.Text(weight=ft.FontWeight.BOLD, color="#667eea")
+        question_text = ft.Text(size=16)
+        option_buttons = [
+            ft.ElevatedButton(
+                on_click=lambda e: check_answer(e.control.data),
+                width=350,
+                style=ft.ButtonStyle(shape=ft.RoundedRectangleBorder(radius=10)),
+            ) for _ in range(QUIZ_OPTION_COUNT)
         ]
+        options_column = ft.Column(option_buttons, spacing=10, 
+                                   horizontal_alignment=ft.CrossAxisAlignment.CENTER)
+        result_text = ft.Text(size=18, weight=ft.FontWeight.BOLD)
+        result_section = ft.Column([
+            result_text,
+            ft.ElevatedButton("다음 문제", on_click=next_question, 
+                              bgcolor="#667eea", color=ft.Colors.WHITE),
+        ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=20)
+        question_section = ft.Column([
+            ft.Column([
+                counter_text,
+                score_text,
+                ft.Container(
+                    content=prompt_text,
+                    padding=20,
+                    bgcolor=ft.Colors.WHITE,
+                    border_radius=15,
+                ),
+                question_text,
+            ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=10),
+            options_column,
+            result_section,
+        ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=20)
+        final_text = ft.Text(size=20)
+        finish_section = ft.Container(
+            content=ft.Column([
+                ft.Text("퀴즈 완료!", size=24, weight=ft.FontWeight.BOLD),
+                final_text,
+                ft.ElevatedButton("다시 시작", on_click=start_quiz, bgcolor="#667eea", color=ft.Colors.WHITE),
+            ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=15),
+            padding=30,
+            bgcolor=ft.Colors.WHITE,
+            border_radius=15,
+        )
+        placeholder = ft.Text("시작 버튼을 클릭하세요", color="#666")
         
-        if quiz_list and quiz_index < len(quiz_list):
-            current = quiz_list[quiz_index]
-            
-            question_card = ft.Container(
-                content=ft.Column([
-                    ft.Text(f"문제 {quiz_index + 1} / {len(quiz_list)}", color="#666"),
-                    ft.Text(f"점수: {quiz_score}", weight=ft.FontWeight.BOLD),
-                    ft.Container(
-                        content=ft.Text(current['hanja'], size=60, weight=ft.FontWeight.BOLD, color="#667eea"),
-                        padding=20,
-                        bgcolor=ft.Colors.WHITE,
-                        border_radius=15,
-                    ),
-                    ft.Text("이 한자의 뜻은?", size=16),
-                ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=10),
-            )
-            content.append(question_card)
-            
-            if not quiz_result:
-                option_buttons = [
-                    ft.ElevatedButton(
-                        opt[:30] + "..." if len(opt) > 30 else opt,
-                        on_click=lambda e, o=opt: check_answer(o),
-                        width=350,
-                        style=ft.ButtonStyle(shape=ft.RoundedRectangleBorder(radius=10)),
-                    ) for opt in quiz_options
-                ]
-                content.append(ft.Column(option_buttons, spacing=10, 
-                                         horizontal_alignment=ft.CrossAxisAlignment.CENTER))
-            else:
-                result_color = ft.Colors.GREEN if "정답" in quiz_result else ft.Colors.RED
-                content.append(ft.Text(quiz_result, size=18, weight=ft.FontWeight.BOLD, color=result_color))
-                content.append(ft.ElevatedButton("다음 문제", on_click=next_question, 
-                                                  bgcolor="#667eea", color=ft.Colors.WHITE))
-        
-        elif quiz_list and quiz_index >= len(quiz_list):
-            content.append(ft.Container(
-                content=ft.Column([
-                    ft.Text("퀴즈 완료!", size=24, weight=ft.FontWeight.BOLD),
-                    ft.Text(f"최종 점수: {quiz_score} / {len(quiz_list)}", size=20),
-                    ft.ElevatedButton("다시 시작", on_click=start_quiz, bgcolor="#667eea", color=ft.Colors.WHITE),
-                ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=15),
-                padding=30,
-                bgcolor=ft.Colors.WHITE,
-                border_radius=15,
-            ))
-        else:
-            content.append(ft.Text("시작 버튼을 클릭하세요", color="#666"))
+        def render_answer():
+            """Swap the options for the result; return the controls that changed."""
+            answered = quiz.correct is not None
+            options_column.visible = not answered
+            result_section.visible = answered
+            if answered:
+                result_text.value = ("정답입니다! 🎉" if quiz.correct
+                                     else f"오답입니다. 정답: {quiz.current.answer}")
+                result_text.color = ft.Colors.GREEN if quiz.correct else ft.Colors.RED
+            score_text.value = f"점수: {quiz.score}"
+            return options_column, result_section, score_text
+        
+        def render_quiz():
+            """Apply the quiz state to the controls; return the ones that changed."""
+            in_progress = bool(quiz.questions) and quiz.in_progress
+            question_section.visible = in_progress
+            finish_section.visible = quiz.finished
+            placeholder.visible = not quiz.questions
+            if in_progress:
+                current = quiz.current
+                _, prompt_field, _, question = QUIZ_MODES[quiz.mode]
+                counter_text.value = f"문제 {quiz.index + 1} / {len(quiz.questions)}"
+                prompt_text.value = current.prompt
+                prompt_text.size = 28 if prompt_field == 'meaning' else 60
+                question_text.value = question
+                for button, opt in zip(option_buttons, current.options):
+                    button.text = opt[:30] + "..." if len(opt) > 30 else opt
+                    button.data = opt
+                for i, button in enumerate(option_buttons):
+                    button.visible = i < len(current.options)
+                render_answer()
+            elif quiz.finished:
+                final_text.value = f"최종 점수: {quiz.score} / {len(quiz.questions)}"
+            return question_section, finish_section, placeholder
+        
+        render_quiz()
         
         return ft.Container(
-            content=ft.Column(content, horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=20),
+            content=ft.Column([
+                ft.Text("한자 퀴즈", size=24, weight=ft.FontWeight.BOLD),
+                ft.Row([
+                    create_grade_dropdown(on_grade_change),
+                    ft.Dropdown(
+                        label="문제 유형",
+                        options=[ft.dropdown.Option(key=mode, text=label)
+                                 for mode, (label, _, _, _) in QUIZ_MODES.items()],
+                        value=quiz.mode,
+                        width=150,
+                        on_change=on_mode_change,
+                    ),
+                    ft.Dropdown(
+                        label="출제 방식",
+                        options=[ft.dropdown.Option(key=deck, text=label)
+                                 for deck, label in DECK_MODES.items()],
+                        value=quiz_deck,
+                        width=120,
+                        on_change=on_deck_change,
+                    ),
+                    ft.ElevatedButton("시작", on_click=start_quiz, bgcolor="#667eea", color=ft.Colors.WHITE),
+                ], spacing=20),
+                question_section,
+                finish_section,
+                placeholder,
+            ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=20),
             padding=30,
         )
     
+    def show_snack_bar(message, color):
+        """Show a snack bar message."""
+        page.snack_bar = ft.SnackBar(content=ft.Text(message), bgcolor=color)
+        page.snack_bar.open = True
+        page.update()
+    
+    @instrument.timed('view')
     def create_practice_view():
         """Create writing practice PDF download view."""
-        nonlocal selected_grade
+        from hanja_core import worksheet
+        practice_grade = ""
+        practice_count = PRACTICE_COUNTS[0]
+        practice_layout = worksheet.DEFAULT_LAYOUT
+        pdf_cancel = None
         
         def on_grade_change(e):
-            nonlocal selected_grade
-            selected_grade = e.control.value if e.control.value != "전체" else ""
+            nonlocal practice_grade
+            practice_grade = grade_value(e)
+        
+        def on_count_change(e):
+            nonlocal practice_count
+            practice_count = int(e.control.value)
+        
+        def on_layout_change(e):
+            nonlocal practice_layout
+            practice_layout = e.control.value
         
         def download_pdf(e):
-            pdf_data = generate_pdf(selected_grade, 10, 10)
-            if pdf_data:
-                filename = f"hanja_practice_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-                filepath = os.path.join(os.path.expanduser("~/Downloads"), filename)
-                with open(filepath, 'wb') as f:
-                    f.write(pdf_data)
-                page.snack_bar = ft.SnackBar(
-                    content=ft.Text(f"PDF가 다운로드 폴더에 저장되었습니다: {filename}"),
-                    bgcolor=ft.Colors.GREEN,
-                )
-                page.snack_bar.open = True
-                page.update()
+            filename = f"hanja_practice_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+            
+            def render(out_dir, progress, cancel):
+                path = os.path.join(out_dir, filename)
+                drawn = generate_pdf(path, practice_grade, practice_count, practice_layout,
+                                     progress, cancel)
+                return [path] if drawn else []
+            start_pdf(practice_count, render)
+        
+        def download_workbook(e):
+            start_pdf(get_catalog().count((practice_grade,)),
+                      lambda out_dir, progress, cancel: generate_workbook(
+                          out_dir, practice_grade, practice_layout, progress, cancel))
+        
+        def start_pdf(total, render):
+            nonlocal pdf_cancel
+            pdf_cancel = threading.Event()
+            threading.Thread(target=run_pdf, args=(render, pdf_cancel), daemon=True).start()
+            page.update(*render_progress(True, 0, total, 1))
+        
+        def cancel_pdf(e):
+            if pdf_cancel is not None:
+                pdf_cancel.set()
+        
+        def progress_reporter():
+            """A progress callback sending an update per page or PDF_PROGRESS_INTERVAL."""
+            last_page = 0
+            last_sent = 0.0
+            
+            def report_progress(done, total, page_number):
+                nonlocal last_page, last_sent
+                now = time.monotonic()
+                if (page_number == last_page and done != total
+                        and now - last_sent < PDF_PROGRESS_INTERVAL):
+                    return
+                last_page = page_number
+                last_sent = now
+                page.update(*render_progress(True, done, total, page_number))
+            return report_progress
+        
+        def run_pdf(render, cancel):
+            """Render in the background into a work folder, then move the files into place."""
+            from hanja_core import worksheet
+            downloads = os.path.expanduser("~/Downloads")
+            work_dir = None
+            try:
+                work_dir = tempfile.mkdtemp(prefix=".hanja-pdf-", dir=downloads)
+                paths = render(work_dir, progress_reporter(), cancel)
+                names = [os.path.basename(path) for path in paths]
+                for name in names:
+                    os.replace(os.path.join(work_dir, name), os.path.join(downloads, name))
+                if names:
+                    more = f" 외 {len(names) - 1}개" if len(names) > 1 else ""
+                    show_snack_bar(f"PDF가 다운로드 폴더에 저장되었습니다: {names[0]}{more}",
+                                   ft.Colors.GREEN)
+                else:
+                    show_snack_bar("선택한 급수에 한자가 없어 PDF를 만들지 않았습니다", ft.Colors.GREY)
+            except worksheet.PdfCancelled:
+                show_snack_bar("PDF 생성을 취소했습니다", ft.Colors.GREY)
+            except OSError as err:
+                show_snack_bar(f"PDF를 저장하지 못했습니다: {err}", ft.Colors.RED)
+            except Exception as err:
+                # Nothing else reports errors of this background thread
+                show_snack_bar(f"PDF를 만들지 못했습니다: {err}", ft.Colors.RED)
+            finally:
+                if work_dir is not None:
+                    shutil.rmtree(work_dir, ignore_errors=True)
+                page.update(*render_progress(False))
+        
+        download_button = ft.ElevatedButton(
+            "PDF 다운로드",
+            icon=ft.Icons.DOWNLOAD,
+            on_click=download_pdf,
+            bgcolor="#667eea",
+            color=ft.Colors.WHITE,
+            style=ft.ButtonStyle(padding=20),
+        )
+        workbook_button = ft.OutlinedButton(
+            "급수 전체 연습장",
+            icon=ft.Icons.MENU_BOOK,
+            on_click=download_workbook,
+            style=ft.ButtonStyle(padding=20),
+        )
+        progress_bar = ft.ProgressBar(width=300, value=0, color="#667eea")
+        progress_text = ft.Text(color="#666", size=12)
+        progress_row = ft.Column([
+            progress_bar,
+            ft.Row([
+                progress_text,
+                ft.TextButton("취소", on_click=cancel_pdf),
+            ], alignment=ft.MainAxisAlignment.CENTER),
+        ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, visible=False)
+        
+        def render_progress(running, done=0, total=0, page_number=0):
+            """Show or hide worksheet progress; return the controls that changed."""
+            download_button.disabled = running
+            workbook_button.disabled = running
+            progress_row.visible = running
+            if running:
+                progress_bar.value = done / total if total else 0
+                progress_text.value = f"{page_number}페이지 · {done} / {total}자"
+            return download_button, workbook_button, progress_row
         
         return ft.Container(
             content=ft.Column([
                 ft.Text("일일 한자 쓰기 연습", size=24, weight=ft.FontWeight.BOLD),
-                ft.Text("랜덤으로 선택된 한자를 10번씩 쓰기 연습할 수 있는 PDF를 다운로드하세요.", 
+                ft.Text("랜덤으로 선택된 한자를 칸마다 반복해 쓰기 연습할 수 있는 PDF를 다운로드하세요.", 
                         color="#666"),
                 ft.Container(height=20),
-                create_grade_dropdown(on_grade_change),
+                ft.Row([
+                    create_grade_dropdown(on_grade_change),
+                    ft.Dropdown(
+                        label="한자 수",
+                        options=[ft.dropdown.Option(str(n)) for n in PRACTICE_COUNTS],
+                        value=str(practice_count),
+                        width=120,
+                        on_change=on_count_change,
+                    ),
+                    ft.Dropdown(
+                        label="칸 레이아웃",
+                        options=[ft.dropdown.Option(key=key, text=label)
+                                 for key, (label, _, _, _) in worksheet.LAYOUTS.items()],
+                        value=practice_layout,
+                        width=260,
+                        on_change=on_layout_change,
+                    ),
+                ], alignment=ft.MainAxisAlignment.CENTER, spacing=20),
                 ft.Container(height=20),
                 ft.Container(
                     content=ft.Column([
                         ft.Icon(ft.Icons.DESCRIPTION, size=60, color="#667eea"),
                         ft.Text("A4 크기 PDF", size=16, weight=ft.FontWeight.BOLD),
-                        ft.Text("10개 한자 × 10번 쓰기", color="#666"),
+                        ft.Text("선택한 수의 한자 × 레이아웃의 칸 수만큼 쓰기", color="#666"),
                     ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=10),
                     padding=30,
                     bgcolor=ft.Colors.WHITE,
@@ -602,36 +1069,89 @@ def main(page: ft.Page):
                     shadow=ft.BoxShadow(blur_radius=10, color="#00000020"),
                 ),
                 ft.Container(height=20),
-                ft.ElevatedButton(
-                    "PDF 다운로드",
-                    icon=ft.Icons.DOWNLOAD,
-                    on_click=download_pdf,
-                    bgcolor="#667eea",
-                    color=ft.Colors.WHITE,
-                    style=ft.ButtonStyle(padding=20),
-                ),
-                ft.Text("* 매번 다른 랜덤 한자가 선택됩니다", color="#999", size=12),
+                ft.Row([download_button, workbook_button],
+                       alignment=ft.MainAxisAlignment.CENTER, spacing=20),
+                progress_row,
+                ft.Text("* 매번 다른 랜덤 한자가 선택됩니다. 연습장은 선택한 급수의 모든 한자를 급수·음 순서로 담습니다.",
+                        color="#999", size=12),
             ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=10),
             padding=50,
         )
     
-    def update_content():
-        """Update main content based on current view."""
-        if current_view == "home":
-            content_area.content = create_home_view()
-        elif current_view == "list":
-            content_area.content = create_list_view()
-        elif current_view == "flashcard":
-            content_area.content = create_flashcard_view()
-        elif current_view == "quiz":
-            content_area.content = create_quiz_view()
-        elif current_view == "practice":
-            content_area.content = create_practice_view()
-        page.update()
+    def create_stats_view():
+        """Create the instrumentation panel (only reachable with MAKING_HANJA_INSTRUMENT)."""
+        table = ft.DataTable(columns=[
+            ft.DataColumn(ft.Text(label), numeric=numeric)
+            for label, numeric in (("분류", False), ("작업", False), ("횟수", True),
+                                   ("합계", True), ("p50", True), ("p95", True), ("최대", True))
+        ])
+        slow_column = ft.Column(spacing=4)
+        
+        def render_stats():
+            """Fill the table from the current snapshot; return the controls that changed."""
+            snapshot = instrument.snapshot()
+            ops = [(category, name, stats)
+                   for category, names in snapshot['operations'].items()
+                   for name, stats in names.items()]
+            ops.sort(key=lambda op: op[2]['total_ms'], reverse=True)
+            table.rows = [
+                ft.DataRow(cells=[
+                    ft.DataCell(ft.Text(category)),
+                    ft.DataCell(ft.Text(name[:60], tooltip=name)),
+                    ft.DataCell(ft.Text(f"{stats['count']:,}")),
+                    ft.DataCell(ft.Text(f"{stats['total_ms']:,.1f}ms")),
+                    ft.DataCell(ft.Text(f"{stats['p50_ms']:.2f}")),
+                    ft.DataCell(ft.Text(f"{stats['p95_ms']:.2f}")),
+                    ft.DataCell(ft.Text(f"{stats['max_ms']:.2f}")),
+                ]) for category, name, stats in ops[:STATS_ROWS]
+            ]
+            slow_column.controls = [
+                ft.Text(f"{entry['at'][11:]}  {entry['category']} {entry['name'][:60]}  "
+                        f"{entry['ms']:.1f}ms", size=12, color="#666")
+                for entry in reversed(snapshot['slow'][-STATS_SLOW_ROWS:])
+            ] or [ft.Text("없음", size=12, color="#999")]
+            return table, slow_column
+        
+        def refresh(e):
+            page.update(*render_stats())
+        
+        def save_json(e):
+            filename = f"hanja_stats_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            filepath = instrument.EXPORT_PATH or os.path.join(os.path.expanduser("~/Downloads"), filename)
+            instrument.export(filepath)
+            show_snack_bar(f"성능 기록을 저장했습니다: {filepath}", ft.Colors.GREEN)
+        
+        render_stats()
+        
+        return ft.Container(
+            content=ft.Column([
+                ft.Row([
+                    ft.Text("성능 기록", size=24, weight=ft.FontWeight.BOLD),
+                    ft.ElevatedButton("새로 고침", on_click=refresh),
+                    ft.ElevatedButton("JSON 저장", on_click=save_json),
+                ], spacing=20),
+                ft.Text("작업별 실행 시간 (ms, 합계 순)", color="#666"),
+                table,
+                ft.Text(f"느린 작업 ({instrument.SLOW_MS:g}ms 이상, 최근 순)", color="#666"),
+                slow_column,
+            ], spacing=10, scroll=ft.ScrollMode.AUTO),
+            padding=30,
+        )
+    
+    view_builders = {
+        "home": create_home_view,
+        "list": create_list_view,
+        "flashcard": create_flashcard_view,
+        "quiz": create_quiz_view,
+        "practice": create_practice_view,
+        "stats": create_stats_view,
+    }
+    # Retained views, built on first visit
+    views = {"home": create_home_view()}
     
     # Main layout
     content_area = ft.Container(
-        content=create_home_view(),
+        content=views["home"],
         expand=True,
         bgcolor="#f8f9fa",
     )
@@ -642,7 +1162,26 @@ def main(page: ft.Page):
             content_area,
         ], spacing=0, expand=True)
     )
+    startup_profile.mark("첫 화면")
+    
+    threading.Thread(target=warm_up, daemon=True).start()
+
+
+def serve(host, port):
+    """Serve the app to browsers; every session shares the engine built here."""
+    # Build the catalog and quiz pools before the first browser connects
+    engine.quiz_pools
+    print(f"웹 모드: http://{host or 'localhost'}:{port}")
+    ft.app(target=main, view=None, host=host, port=port)
 
 
 if __name__ == "__main__":
-    ft.app(target=main)
+    parser = argparse.ArgumentParser(description="한자 학습 앱")
+    parser.add_argument('--web', action='store_true', help="브라우저용 웹 서버로 실행")
+    parser.add_argument('--host', default=None, help="웹 서버 주소 (기본: 모든 주소)")
+    parser.add_argument('--port', type=int, default=DEFAULT_WEB_PORT, help="웹 서버 포트")
+    args, _ = parser.parse_known_args()
+    if args.web:
+        serve(args.host, args.port)
+    else:
+        ft.app(target=main)
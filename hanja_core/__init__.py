@@ -0,0 +1,21 @@
+"""
+UI-independent study engine for the hanja app.
+Holds the catalog, search, sampling, quizzes, review scheduling and
+sessions, so the desktop app, batch jobs and servers share one engine.
+The worksheet renderer (hanja_core.worksheet) needs reportlab and is
+imported on demand.
+"""
+from .catalog import HanjaCatalog, ResultSet
+from .connections import DEFAULT_DB_PATH, ConnectionManager
+from .engine import StudyEngine
+from .quiz import QUIZ_MODES, Question, QuizBuilder, QuizPools
+from .review import ProgressWriter, ReviewScheduler
+from .sampling import Sampler
+from .sessions import FlashcardSession, ListSession, QuizSession
+
+__all__ = [
+    'DEFAULT_DB_PATH', 'QUIZ_MODES',
+    'ConnectionManager', 'FlashcardSession', 'HanjaCatalog', 'ListSession', 'ProgressWriter',
+    'Question', 'QuizBuilder', 'QuizPools', 'QuizSession', 'ResultSet', 'ReviewScheduler',
+    'Sampler', 'StudyEngine',
+]
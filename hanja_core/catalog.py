@@ -0,0 +1,534 @@
+"""
+In-memory hanja catalog.
+The hanja table is read-only at runtime, so it is loaded once at startup into
+column-oriented arrays and every view is served from memory.
+"""
+import sqlite3
+import sys
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+from . import hangul
+from .connections import connect
+from .meaning_parser import format_meaning, split_display
+from .search import SearchIndex
+
+# Sentinel for NULL stroke counts in the integer columns
+NO_STROKES = -1
+
+# Number of (grade, query, radical, strokes) result sets kept for paging
+RESULT_CACHE_SIZE = 32
+
+
+def _bitmap(positions):
+    """Integer bitmap with the bit of every position set."""
+    positions = list(positions)
+    if not positions:
+        return 0
+    data = bytearray(max(positions) // 8 + 1)
+    for pos in positions:
+        data[pos >> 3] |= 1 << (pos & 7)
+    return int.from_bytes(data, 'little')
+
+
+def _range_bitmap(start, stop):
+    """Integer bitmap of the positions in range(start, stop)."""
+    return ((1 << stop) - 1) ^ ((1 << start) - 1)
+
+
+def _select(positions, bits):
+    """Positions whose bit is set in bits, in the order given."""
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    size = len(data)
+    return [pos for pos in positions if pos >> 3 < size and data[pos >> 3] >> (pos & 7) & 1]
+
+
+def _set_bits(bits):
+    """Positions of the set bits, ascending."""
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    return [i * 8 + j for i, byte in enumerate(data) if byte for j in range(8) if byte >> j & 1]
+
+
+class ResultSet:
+    """Ordered matches for one (grade, query) filter.
+
+    Rows are ordered by the keyset (tier, level_order, main_sound, id), where
+    tier puts exact hanja, reading and meaning matches ahead of the other hits.
+    Cursors are those tuples, so moving to the page before or after a cursor
+    is a binary search plus a slice, whatever the page number.
+    """
+
+    __slots__ = ('_catalog', '_positions', '_tier_ends')
+
+    def __init__(self, catalog, positions, tier_ends=None):
+        self._catalog = catalog
+        self._positions = positions
+        self._tier_ends = tier_ends or (len(positions),)
+
+    def __len__(self):
+        return len(self._positions)
+
+    def key(self, offset):
+        """Return the keyset cursor of the row at an offset."""
+        pos = self._positions[offset]
+        catalog = self._catalog
+        tier = bisect_right(self._tier_ends, offset)
+        return (tier, catalog.level_order[pos], catalog.main_sound[pos], catalog.ids[pos])
+
+    def seek(self, cursor, after=True):
+        """Return the offset of the first row sorting after cursor.
+
+        With after=False the row equal to cursor is included.
+        """
+        lo, hi = 0, len(self._positions)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key = self.key(mid)
+            if key < cursor or (after and key == cursor):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def rows(self, offset, count):
+        """Return up to count rows starting at an offset."""
+        offset = max(0, offset)
+        row = self._catalog.row
+        return [row(pos) for pos in self._positions[offset:offset + count]]
+
+
+class HanjaCatalog:
+    """Read-only, column-oriented copy of the hanja table.
+
+    Rows are stored in display order (level_order, main_sound, id), so a
+    position in the parallel arrays is also the row's rank in the full list.
+
+    Browsing by radical or total stroke count goes through indexes built
+    here: radical -> positions ordered by residual strokes, total strokes ->
+    positions, and an integer bitmap per radical, stroke count and grade, so
+    combining filters is a bitwise AND instead of a scan.
+
+    초성, jamo and romanized queries go through sorted prefix indexes of the
+    search keys of every reading and meaning word (see hangul).
+    """
+
+    __slots__ = (
+        'ids', 'hanja', 'main_sound', 'meaning', 'level', 'level_order',
+        'radical', 'strokes', 'total_strokes', '_pos_by_id', '_level_slices',
+        'groups', '_senses', '_readings', '_search', '_exact',
+        '_results', '_results_lock', '_radical_index', '_radical_bits', '_radical_strokes',
+        '_stroke_index', '_stroke_bits', '_level_bits', '_prefix',
+    )
+
+    def __init__(self, rows, groups=None, search_keys=None):
+        """Build the catalog from hanja rows and optional reading groups.
+
+        groups maps hanja id to a tuple of (meanings, sounds) groups as stored
+        in the meaning/reading tables; rows without an entry fall back to
+        splitting their display meaning. search_keys are the (hanja id,
+        field, choseong, jamo, roman) rows of the search_key table; without
+        them the keys are computed from the readings and meanings.
+        """
+        self.ids = array('i')
+        self.hanja = []
+        self.main_sound = []
+        self.meaning = []
+        self.level = []
+        self.level_order = array('b')
+        self.radical = []
+        self.strokes = array('h')
+        self.total_strokes = array('h')
+        self.groups = []
+        self._pos_by_id = {}
+        self._level_slices = {}
+
+        for row in rows:
+            pos = len(self.hanja)
+            hanja_id, hanja, main_sound, meaning, level, level_order, radical, strokes, total_strokes = row
+            self.ids.append(hanja_id)
+            self.hanja.append(hanja)
+            self.main_sound.append(sys.intern(main_sound))
+            self.meaning.append(meaning)
+            self.level.append(sys.intern(level))
+            self.level_order.append(level_order)
+            self.radical.append(sys.intern(radical) if radical else radical)
+            self.strokes.append(NO_STROKES if strokes is None else strokes)
+            self.total_strokes.append(NO_STROKES if total_strokes is None else total_strokes)
+            self.groups.append((groups or {}).get(hanja_id) or split_display(meaning))
+            self._pos_by_id[hanja_id] = pos
+
+            # Rows arrive sorted by level_order, so each level is one contiguous run
+            start, _ = self._level_slices.get(level, (pos, pos))
+            self._level_slices[level] = (start, pos + 1)
+
+        self._senses = [
+            tuple(m for meanings, _ in groups for m in meanings) for groups in self.groups
+        ]
+        self._readings = [
+            tuple(dict.fromkeys([main_sound, *(s for _, sounds in groups for s in sounds)]))
+            for main_sound, groups in zip(self.main_sound, self.groups)
+        ]
+        self._search = SearchIndex(self.hanja, self._senses, self._readings)
+        # Exact-term lookups in ranking order: hanja, then readings, then meanings
+        self._exact = ({}, {}, {})
+        for pos in range(len(self.hanja)):
+            terms = ((self.hanja[pos],), self._readings[pos], self._senses[pos])
+            for index, values in zip(self._exact, terms):
+                for value in values:
+                    positions = index.setdefault(value, [])
+                    if not positions or positions[-1] != pos:
+                        positions.append(pos)
+        self._build_browse_indexes()
+        self._build_prefix_indexes(search_keys)
+        self._results = OrderedDict()
+        self._results_lock = threading.Lock()
+
+    def _build_browse_indexes(self):
+        """Index rows by radical (ordered by residual strokes) and by total strokes."""
+        by_radical = {}
+        by_total = {}
+        radical_strokes = {}
+        for pos, (radical, strokes, total) in enumerate(
+                zip(self.radical, self.strokes, self.total_strokes)):
+            if radical:
+                by_radical.setdefault(radical, []).append(pos)
+                if strokes != NO_STROKES and total != NO_STROKES:
+                    radical_strokes.setdefault(radical, total - strokes)
+            if total != NO_STROKES:
+                by_total.setdefault(total, []).append(pos)
+        strokes = self.strokes
+        # Positions ascend within each residual stroke count, so rows with
+        # the same count stay in display order
+        self._radical_index = {
+            radical: tuple(sorted(positions, key=lambda pos: (strokes[pos], pos)))
+            for radical, positions in by_radical.items()
+        }
+        self._radical_bits = {radical: _bitmap(p) for radical, p in by_radical.items()}
+        self._radical_strokes = radical_strokes
+        self._stroke_index = {total: tuple(p) for total, p in sorted(by_total.items())}
+        self._stroke_bits = {total: _bitmap(p) for total, p in by_total.items()}
+        self._level_bits = {level: _range_bitmap(start, stop)
+                            for level, (start, stop) in self._level_slices.items()}
+
+    def _build_prefix_indexes(self, search_keys=None):
+        """Index the 초성, jamo and roman keys of readings and of meanings."""
+        if search_keys is None:
+            search_keys = [
+                (hanja_id, field, *hangul.search_keys(term))
+                for hanja_id, readings, senses in zip(self.ids, self._readings, self._senses)
+                for field, terms in (('sound', readings), ('meaning', senses))
+                for term in terms
+            ]
+        pos_by_id = self._pos_by_id
+        pairs = {(kind, field): [] for kind in hangul.KEY_KINDS for field in ('sound', 'meaning')}
+        for hanja_id, field, *keys in search_keys:
+            pos = pos_by_id.get(hanja_id)
+            if pos is None:
+                continue
+            for kind, key in zip(hangul.KEY_KINDS, keys):
+                pairs[kind, field].append((key, pos))
+        # kind -> (readings, meanings), the two match tiers
+        self._prefix = {
+            kind: (hangul.PrefixIndex(pairs[kind, 'sound']),
+                   hangul.PrefixIndex(pairs[kind, 'meaning']))
+            for kind in hangul.KEY_KINDS
+        }
+
+    @classmethod
+    def from_connection(cls, conn):
+        """Load the whole hanja table through an open connection."""
+        cursor = conn.execute('''
+            SELECT id, hanja, main_sound, meaning, level, level_order,
+                   radical, strokes, total_strokes
+            FROM hanja
+            ORDER BY level_order, main_sound, id
+        ''')
+        return cls((tuple(row) for row in cursor), cls._load_groups(conn),
+                   cls._load_search_keys(conn))
+
+    @classmethod
+    def load(cls, db_path):
+        """Open db_path read-only, load the catalog and close the connection."""
+        conn = connect(db_path)
+        try:
+            return cls.from_connection(conn)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _load_groups(conn):
+        """Read the meaning/reading tables into hanja id -> groups."""
+        try:
+            meaning_rows = conn.execute(
+                'SELECT hanja_id, group_no, meaning FROM meaning ORDER BY id').fetchall()
+            reading_rows = conn.execute(
+                'SELECT hanja_id, group_no, sound FROM reading ORDER BY id').fetchall()
+        except sqlite3.OperationalError:
+            # Database built before the normalized tables existed
+            return None
+        parts = {}
+        for hanja_id, group_no, text in meaning_rows:
+            parts.setdefault((hanja_id, group_no), ([], []))[0].append(sys.intern(text))
+        for hanja_id, group_no, sound in reading_rows:
+            parts.setdefault((hanja_id, group_no), ([], []))[1].append(sys.intern(sound))
+        groups = {}
+        for (hanja_id, _), (meanings, sounds) in sorted(parts.items()):
+            groups.setdefault(hanja_id, []).append((tuple(meanings), tuple(sounds)))
+        return {hanja_id: tuple(g) for hanja_id, g in groups.items()}
+
+    @staticmethod
+    def _load_search_keys(conn):
+        """Read the search_key table, or None if the importer predates it."""
+        try:
+            return conn.execute(
+                'SELECT hanja_id, field, choseong, jamo, roman FROM search_key').fetchall()
+        except sqlite3.OperationalError:
+            return None
+
+    def __len__(self):
+        return len(self.hanja)
+
+    def row(self, pos):
+        """Build the dict the views render for the row at a position."""
+        strokes = self.strokes[pos]
+        total_strokes = self.total_strokes[pos]
+        return {
+            'id': self.ids[pos],
+            'hanja': self.hanja[pos],
+            'main_sound': self.main_sound[pos],
+            'meaning': self.meaning[pos],
+            'short_meaning': self.short_meaning(pos),
+            'level': self.level[pos],
+            'radical': self.radical[pos],
+            'strokes': None if strokes == NO_STROKES else strokes,
+            'total_strokes': None if total_strokes == NO_STROKES else total_strokes,
+        }
+
+    def senses(self, pos):
+        """Return every meaning word of the row at a position."""
+        return self._senses[pos]
+
+    def readings(self, pos):
+        """Return every reading of the row at a position, main_sound first."""
+        return self._readings[pos]
+
+    def short_meaning(self, pos):
+        """Format the first reading group, marking that more follow."""
+        groups = self.groups[pos]
+        text = format_meaning(groups[:1])
+        return text + " 외" if len(groups) > 1 else text
+
+    def position(self, hanja_id):
+        """Return the position of a hanja id, or None."""
+        return self._pos_by_id.get(hanja_id)
+
+    def get(self, hanja_id):
+        """Look up a row by hanja id."""
+        pos = self._pos_by_id.get(hanja_id)
+        return None if pos is None else self.row(pos)
+
+    def level_range(self, grade=""):
+        """Return the positions of one grade, or of every row for "" / 전체."""
+        if not grade or grade == "전체":
+            return range(len(self.hanja))
+        start, stop = self._level_slices.get(grade, (0, 0))
+        return range(start, stop)
+
+    def iter_rows(self, grades=("",)):
+        """Yield the row dicts of grades in level_order, main_sound order.
+
+        Rows are built one at a time, so callers can walk any number of
+        grades without holding them all.
+        """
+        if not grades or any(not grade or grade == "전체" for grade in grades):
+            selected = self.levels
+        else:
+            selected = [level for level in self.levels if level in grades]
+        for level in selected:
+            for pos in self.level_range(level):
+                yield self.row(pos)
+
+    def count(self, grades=("",)):
+        """Number of rows iter_rows(grades) yields."""
+        if not grades or any(not grade or grade == "전체" for grade in grades):
+            return len(self.hanja)
+        return sum(len(self.level_range(grade)) for grade in set(grades))
+
+    @property
+    def levels(self):
+        """Level names present in the catalog, in level_order."""
+        return tuple(self._level_slices)
+
+    def radicals(self):
+        """(radical, radical strokes, rows) for every radical, in dictionary order."""
+        return sorted(((radical, self._radical_strokes.get(radical, 0), len(positions))
+                       for radical, positions in self._radical_index.items()),
+                      key=lambda item: (item[1], item[0]))
+
+    def stroke_counts(self):
+        """Every total stroke count present, ascending."""
+        return tuple(self._stroke_index)
+
+    def _browse_bits(self, grade="", radical="", total_strokes=None):
+        """Bitmap of the rows matching every given filter, or None if none is given."""
+        bits = None
+        filters = []
+        if grade and grade != "전체":
+            filters.append(self._level_bits.get(grade, 0))
+        if radical:
+            filters.append(self._radical_bits.get(radical, 0))
+        if total_strokes:
+            filters.append(self._stroke_bits.get(total_strokes, 0))
+        for mask in filters:
+            bits = mask if bits is None else bits & mask
+        return bits
+
+    def browse(self, grade="", radical="", total_strokes=None):
+        """Build the result set of a radical and/or total stroke count within a grade.
+
+        With a radical the rows are ordered by residual strokes, each count
+        a tier of the result set so keyset paging still works; otherwise
+        they are in display order.
+        """
+        bits = self._browse_bits(grade, radical, total_strokes)
+        if bits is None:
+            return ResultSet(self, self.level_range(grade))
+        if not radical:
+            return ResultSet(self, _set_bits(bits))
+        positions = _select(self._radical_index.get(radical, ()), bits)
+        strokes = self.strokes
+        tier_ends = [offset for offset in range(1, len(positions))
+                     if strokes[positions[offset]] != strokes[positions[offset - 1]]]
+        tier_ends.append(len(positions))
+        return ResultSet(self, positions, tuple(tier_ends))
+
+    def neighbour_range(self, grade, spread=1):
+        """Return the positions of a grade and the spread grades on each side.
+
+        Levels are stored in level_order, so the neighbourhood is one run.
+        """
+        levels = self.levels
+        if grade not in self._level_slices:
+            return range(len(self.hanja))
+        index = levels.index(grade)
+        first = levels[max(0, index - spread)]
+        last = levels[min(len(levels) - 1, index + spread)]
+        return range(self._level_slices[first][0], self._level_slices[last][1])
+
+    def _prefix_tiers(self, kind, key, grade="", radical="", total_strokes=None):
+        """Rows with a reading, then rows with a meaning word, whose key starts with key."""
+        readings, meanings = self._prefix[kind]
+        by_reading = set(readings.search(key))
+        by_meaning = set(meanings.search(key)) - by_reading
+        bits = self._browse_bits(grade, radical, total_strokes)
+        tiers = []
+        for matches in (by_reading, by_meaning):
+            matches = sorted(matches)
+            tiers.append(matches if bits is None else _select(matches, bits))
+        return tiers
+
+    def _tiered(self, tiers):
+        """Result set of tiers of positions, in order."""
+        ordered = []
+        tier_ends = []
+        for tier in tiers:
+            ordered.extend(tier)
+            tier_ends.append(len(ordered))
+        return ResultSet(self, ordered, tuple(tier_ends))
+
+    def filter(self, grade="", query="", radical="", total_strokes=None):
+        """Build the result set for a grade, a substring query and browse filters.
+
+        Without a query the result is in display order, or by residual
+        strokes when browsing a radical (see browse). With one, exact
+        hanja matches come first, then rows with the query as a reading,
+        then as a meaning word, then the remaining matches, each tier in
+        display order. 초성 (ㄱㅇ), half-typed (무ㄹ) and romanized (mul)
+        queries match the start of readings, then of meaning words.
+        """
+        lookup = hangul.query_key(query)
+        if lookup is not None:
+            # Same tier numbers as substring queries: readings, then meanings
+            return self._tiered([[], *self._prefix_tiers(*lookup, grade, radical, total_strokes)])
+        positions = self.level_range(grade)
+        if radical or total_strokes:
+            if not query:
+                return self.browse(grade, radical, total_strokes)
+            # The browse bitmap already includes the grade
+            matches = _select(self._search.search(query),
+                              self._browse_bits(grade, radical, total_strokes))
+        elif not query:
+            return ResultSet(self, positions)
+        else:
+            matches = self._search.search(query)
+            if len(positions) != len(self.hanja):
+                # Matches are sorted and each grade is a contiguous run, so the
+                # grade filter is a slice of the posting list
+                matches = matches[bisect_left(matches, positions.start):
+                                  bisect_left(matches, positions.stop)]
+        hanja = self.hanja
+        tiers = ([], [], [], [])
+        for pos in matches:
+            if hanja[pos] == query:
+                tiers[0].append(pos)
+            elif query in self.readings(pos):
+                tiers[1].append(pos)
+            elif query in self.senses(pos):
+                tiers[2].append(pos)
+            else:
+                tiers[3].append(pos)
+        return self._tiered(tiers)
+
+    def results(self, grade="", query="", radical="", total_strokes=None):
+        """Return the cached result set for a filter, building it on first use.
+
+        The count and ordering are reused while only the page changes.
+        """
+        key = ("" if grade == "전체" else grade, query, radical or "", total_strokes or None)
+        with self._results_lock:
+            results = self._results.get(key)
+            if results is not None:
+                self._results.move_to_end(key)
+                return results
+        # Built outside the lock; background searches may race to build the
+        # same key, and either copy is correct
+        results = self.filter(*key)
+        with self._results_lock:
+            self._results[key] = results
+            if len(self._results) > RESULT_CACHE_SIZE:
+                self._results.popitem(last=False)
+        return results
+
+    def preview(self, grade="", query="", limit=20, radical="", total_strokes=None):
+        """Return the first limit rows of a filter without building the full result.
+
+        The rows are the same as the first rows of filter(grade, query): the
+        exact tiers come from term lookups and the rest stream from the
+        search index until limit is reached. Browse filters are bitmap
+        intersections, already cheap, so they just take the full result.
+        """
+        if radical or total_strokes or hangul.query_key(query) is not None:
+            return self.results(grade, query, radical, total_strokes).rows(0, limit)
+        positions = self.level_range(grade)
+        if not query:
+            return [self.row(pos) for pos in positions[:limit]]
+        picked = []
+        seen = set()
+        for index in self._exact:
+            for pos in index.get(query, ()):
+                if pos in positions and pos not in seen:
+                    seen.add(pos)
+                    picked.append(pos)
+        for pos in self._search.iter_search(query, positions.start, positions.stop):
+            if len(picked) >= limit:
+                break
+            if pos not in seen:
+                picked.append(pos)
+        return [self.row(pos) for pos in picked[:limit]]
+
+    def page(self, grade="", query="", page_num=1, per_page=20):
+        """Return one page of rows and the total number of matches."""
+        results = self.results(grade, query)
+        return results.rows((page_num - 1) * per_page, per_page), len(results)
@@ -0,0 +1,103 @@
+"""
+Shared SQLite connections.
+Opening a connection and re-preparing its statements costs more than most of
+the queries this app runs, so connections are opened once and reused: one
+read-only connection per thread (opened with a mode=ro URI) and a single
+writer connection in WAL mode for the progress writer. mmap and page cache
+sizes come from MAKING_HANJA_MMAP_SIZE (bytes) and MAKING_HANJA_CACHE_SIZE
+(KiB).
+"""
+import atexit
+import os
+import pathlib
+import sqlite3
+import threading
+
+from . import instrument
+
+# Database next to the project root unless MAKING_HANJA_DB_PATH is set
+DEFAULT_DB_PATH = os.environ.get(
+    'MAKING_HANJA_DB_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'making_hanja.sqlite3'))
+
+# Prepared statements kept per connection (sqlite3's default is 128)
+STATEMENT_CACHE_SIZE = 256
+
+MMAP_SIZE = int(os.environ.get('MAKING_HANJA_MMAP_SIZE', 64 * 1024 * 1024))
+CACHE_SIZE_KIB = int(os.environ.get('MAKING_HANJA_CACHE_SIZE', 16 * 1024))
+
+
+def connect(db_path, readonly=True, check_same_thread=True):
+    """Open a connection with the shared statement cache and PRAGMAs.
+
+    Read-only connections go through a mode=ro URI, so they can never take
+    a write lock. With instrumentation on, every statement is timed.
+    """
+    if readonly:
+        uri = pathlib.Path(os.path.abspath(db_path)).as_uri() + '?mode=ro'
+        conn = sqlite3.connect(uri, uri=True, cached_statements=STATEMENT_CACHE_SIZE,
+                               check_same_thread=check_same_thread,
+                               factory=instrument.connection_factory())
+    else:
+        conn = sqlite3.connect(db_path, cached_statements=STATEMENT_CACHE_SIZE,
+                               check_same_thread=check_same_thread,
+                               factory=instrument.connection_factory())
+    conn.execute(f'PRAGMA mmap_size = {MMAP_SIZE}')
+    conn.execute(f'PRAGMA cache_size = -{CACHE_SIZE_KIB}')
+    return conn
+
+
+class ConnectionManager:
+    """Long-lived connections to one database, closed together on shutdown."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._opened = []
+        self._writer = None
+        self._lock = threading.Lock()
+        self._closed = False
+        atexit.register(self.close)
+
+    def read(self):
+        """Return this thread's read-only connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Only this thread uses it, but close() may run on another one
+            conn = connect(self.db_path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            with self._lock:
+                if self._closed:
+                    conn.close()
+                    raise sqlite3.ProgrammingError("connection manager is closed")
+                self._opened.append(conn)
+            self._local.conn = conn
+        return conn
+
+    def writer(self):
+        """Return the shared writer connection.
+
+        It may be used from any thread; callers serialize their
+        transactions (the progress writer holds its own lock).
+        """
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("connection manager is closed")
+            if self._writer is None:
+                self._writer = connect(self.db_path, readonly=False, check_same_thread=False)
+                self._writer.execute('PRAGMA journal_mode = WAL')
+                self._writer.execute('PRAGMA synchronous = NORMAL')
+                self._opened.append(self._writer)
+            return self._writer
+
+    def close(self):
+        """Close every connection opened through the manager."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            opened, self._opened = self._opened, []
+            self._writer = None
+        for conn in opened:
+            conn.close()
+        atexit.unregister(self.close)
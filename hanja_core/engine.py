@@ -0,0 +1,80 @@
+"""
+Process-wide study engine.
+Owns what every session shares: the connection manager, the in-memory
+catalog and quiz pools (built once, read-only afterwards), the progress
+writer and one review scheduler per client. Sessions are cheap objects
+created from it, so a server holds one engine for all its connections.
+"""
+import threading
+
+from .catalog import HanjaCatalog
+from .connections import DEFAULT_DB_PATH, ConnectionManager
+from .quiz import QuizBuilder, QuizPools
+from .review import ProgressWriter, ReviewScheduler
+from .sampling import Sampler
+from .sessions import FlashcardSession, ListSession, QuizSession
+
+
+class StudyEngine:
+    """Lazily loaded catalog, connections and schedulers for one database."""
+
+    def __init__(self, db_path=DEFAULT_DB_PATH, seed=None):
+        self.db_path = db_path
+        self.seed = seed
+        self.connections = ConnectionManager(db_path)
+        self._catalog = None
+        self._quiz_pools = None
+        self._catalog_lock = threading.Lock()
+        self._writer = None
+        self._schedulers = {}
+        self._scheduler_lock = threading.Lock()
+
+    @property
+    def catalog(self):
+        """The shared catalog, loaded on first use."""
+        with self._catalog_lock:
+            if self._catalog is None:
+                self._catalog = HanjaCatalog.from_connection(self.connections.read())
+        return self._catalog
+
+    @property
+    def quiz_pools(self):
+        """Distractor pools shared by every quiz builder, built on first use."""
+        catalog = self.catalog
+        with self._catalog_lock:
+            if self._quiz_pools is None:
+                self._quiz_pools = QuizPools(catalog)
+        return self._quiz_pools
+
+    def scheduler(self, client_id):
+        """The review scheduler of one client, opened on first use."""
+        with self._scheduler_lock:
+            scheduler = self._schedulers.get(client_id)
+            if scheduler is None:
+                if self._writer is None:
+                    self._writer = ProgressWriter(self.connections)
+                scheduler = ReviewScheduler(self.connections, client_id, self._writer)
+                self._schedulers[client_id] = scheduler
+        return scheduler
+
+    def quiz_builder(self, seed=None):
+        """A quiz builder on the shared pools with its own sampler (seed or the engine's)."""
+        return QuizBuilder(Sampler(self.catalog, self.seed if seed is None else seed),
+                           pools=self.quiz_pools)
+
+    def list_session(self, per_page=20):
+        return ListSession(self.catalog, per_page)
+
+    def flashcard_session(self, builder, client_id=None):
+        return FlashcardSession(builder, client_id and self.scheduler(client_id))
+
+    def quiz_session(self, builder, client_id=None, option_count=4):
+        return QuizSession(builder, client_id and self.scheduler(client_id), option_count)
+
+    def close(self):
+        """Commit queued answers and close every connection."""
+        with self._scheduler_lock:
+            writer, self._writer, self._schedulers = self._writer, None, {}
+        if writer is not None:
+            writer.close()
+        self.connections.close()
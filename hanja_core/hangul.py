@@ -0,0 +1,133 @@
+"""
+Hangul search keys for readings and meanings.
+Each term gets three keys: its 초성 (initial consonants, 사람 -> ㅅㄹ), its
+jamo spelled out (사람 -> ㅅㅏㄹㅏㅁ, with compound vowels and finals split
+so a half-typed syllable is a prefix of the full one) and a syllable-by-
+syllable Revised Romanization (사람 -> saram). The importer stores the keys
+in the search_key table; PrefixIndex answers prefix queries on them with two
+binary searches over the sorted keys.
+"""
+from array import array
+from bisect import bisect_left
+
+SYLLABLE_FIRST = 0xAC00
+SYLLABLE_LAST = 0xD7A3
+JAMO_FIRST = 0x3131
+JAMO_LAST = 0x318E
+
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONGSEONG = ("", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ",
+             "ㄿ", "ㅀ", "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ")
+
+# Compound jamo as the keystrokes that type them
+SPLIT_JAMO = {
+    "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+    "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ",
+}
+
+# Revised Romanization, in CHOSEONG / JUNGSEONG / JONGSEONG order
+ROMAN_INITIAL = ("g", "kk", "n", "d", "tt", "r", "m", "b", "pp", "s", "ss", "", "j", "jj",
+                 "ch", "k", "t", "p", "h")
+ROMAN_VOWEL = ("a", "ae", "ya", "yae", "eo", "e", "yeo", "ye", "o", "wa", "wae", "oe", "yo",
+               "u", "wo", "we", "wi", "yu", "eu", "ui", "i")
+ROMAN_FINAL = ("", "k", "k", "k", "n", "n", "n", "t", "l", "k", "m", "l", "l", "l", "p", "l",
+               "m", "p", "p", "t", "t", "ng", "t", "t", "k", "t", "p", "t")
+
+_CHOSEONG_SET = frozenset(CHOSEONG)
+
+
+def _syllable(char):
+    """(initial, vowel, final) indexes of a Hangul syllable, or None."""
+    code = ord(char)
+    if not SYLLABLE_FIRST <= code <= SYLLABLE_LAST:
+        return None
+    code -= SYLLABLE_FIRST
+    return code // 588, code % 588 // 28, code % 28
+
+
+def choseong(text):
+    """Initial consonants of text; characters that are not syllables are dropped."""
+    out = []
+    for char in text:
+        parts = _syllable(char)
+        if parts is not None:
+            out.append(CHOSEONG[parts[0]])
+        elif char in _CHOSEONG_SET:
+            out.append(char)
+    return "".join(out)
+
+
+def jamo(text):
+    """Text spelled out as compatibility jamo, compounds split into keystrokes."""
+    out = []
+    for char in text:
+        parts = _syllable(char)
+        if parts is None:
+            out.append(SPLIT_JAMO.get(char, char))
+            continue
+        initial, vowel, final = parts
+        out.append(CHOSEONG[initial])
+        out.append(SPLIT_JAMO.get(JUNGSEONG[vowel], JUNGSEONG[vowel]))
+        out.append(SPLIT_JAMO.get(JONGSEONG[final], JONGSEONG[final]))
+    return "".join(out)
+
+
+def romanize(text):
+    """Revised Romanization of each syllable, without sound-change rules."""
+    out = []
+    for char in text:
+        parts = _syllable(char)
+        if parts is None:
+            if char.isascii() and char.isalpha():
+                out.append(char.lower())
+            continue
+        initial, vowel, final = parts
+        out.append(ROMAN_INITIAL[initial] + ROMAN_VOWEL[vowel] + ROMAN_FINAL[final])
+    return "".join(out)
+
+
+def search_keys(term):
+    """(choseong, jamo, roman) keys of a reading or meaning."""
+    return choseong(term), jamo(term), romanize(term)
+
+
+# Key kinds, in the order search_keys returns them
+KEY_KINDS = ('choseong', 'jamo', 'roman')
+
+
+def query_key(query):
+    """(kind, key) to look a search box query up by, or None for plain queries.
+
+    Only consonants -> 초성; any other loose jamo (a syllable being typed)
+    -> jamo prefix; latin letters -> romanization. Queries of whole
+    syllables or hanja keep using the substring index.
+    """
+    if not query:
+        return None
+    if all(char in _CHOSEONG_SET for char in query):
+        return 'choseong', query
+    if any(JAMO_FIRST <= ord(char) <= JAMO_LAST for char in query):
+        return 'jamo', jamo(query)
+    if query.isascii() and query.replace(" ", "").isalpha():
+        return 'roman', query.replace(" ", "").lower()
+    return None
+
+
+class PrefixIndex:
+    """Sorted (key, position) pairs answering prefix lookups by binary search."""
+
+    __slots__ = ('_keys', '_positions')
+
+    def __init__(self, pairs):
+        pairs = sorted(pair for pair in pairs if pair[0])
+        self._keys = [key for key, _ in pairs]
+        self._positions = array('i', (pos for _, pos in pairs))
+
+    def search(self, prefix):
+        """Positions of every key starting with prefix (unordered, may repeat)."""
+        keys = self._keys
+        lo = bisect_left(keys, prefix)
+        hi = bisect_left(keys, prefix + "\U0010ffff", lo)
+        return self._positions[lo:hi]
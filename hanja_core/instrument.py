@@ -0,0 +1,245 @@
+"""
+Opt-in timing of SQL statements, view builds, page updates and PDF renders.
+Enabled with MAKING_HANJA_INSTRUMENT=1; MAKING_HANJA_INSTRUMENT_OUT names a
+JSON file written at exit and MAKING_HANJA_SLOW_MS the threshold (default
+50ms) above which an operation is also written to the slow log on stderr.
+When disabled, timed() returns functions unchanged and connections use the
+plain sqlite3 classes, so nothing is measured or wrapped.
+"""
+import atexit
+import functools
+import inspect
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+ENABLED = os.environ.get('MAKING_HANJA_INSTRUMENT', '') not in ('', '0')
+EXPORT_PATH = os.environ.get('MAKING_HANJA_INSTRUMENT_OUT')
+SLOW_MS = float(os.environ.get('MAKING_HANJA_SLOW_MS', 50))
+
+# Recent samples kept per operation for the percentiles
+MAX_SAMPLES = 2048
+# Slow operations kept for the export and the stats panel
+MAX_SLOW = 200
+# Characters of SQL text (the operation name) and of parameters or arguments
+# (the slow entry detail) that are kept
+MAX_DETAIL = 300
+
+_lock = threading.Lock()
+_stats = {}
+_slow = deque(maxlen=MAX_SLOW)
+
+
+class _Histogram:
+    """Exact count, total and max plus a window of recent samples."""
+
+    __slots__ = ('count', 'total', 'max', 'samples')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=MAX_SAMPLES)
+
+    def add(self, ms):
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+        self.samples.append(ms)
+
+    def summary(self):
+        ordered = sorted(self.samples)
+        return {
+            'count': self.count,
+            'total_ms': round(self.total, 3),
+            'p50_ms': round(_percentile(ordered, 0.50), 3),
+            'p95_ms': round(_percentile(ordered, 0.95), 3),
+            'max_ms': round(self.max, 3),
+        }
+
+
+def _percentile(ordered, fraction):
+    """Nearest-rank percentile of a sorted list."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _short(value):
+    text = value if isinstance(value, str) else repr(value)
+    text = ' '.join(text.split())
+    return text if len(text) <= MAX_DETAIL else text[:MAX_DETAIL] + "…"
+
+
+def record(category, name, seconds, detail=None):
+    """Add one timing; operations over SLOW_MS go to the slow log too."""
+    ms = seconds * 1000
+    entry = None
+    with _lock:
+        histogram = _stats.get((category, name))
+        if histogram is None:
+            histogram = _stats[(category, name)] = _Histogram()
+        histogram.add(ms)
+        if ms >= SLOW_MS:
+            entry = {
+                'at': datetime.now().isoformat(timespec='milliseconds'),
+                'category': category,
+                'name': name,
+                'ms': round(ms, 3),
+                'detail': _short(detail) if detail is not None else None,
+            }
+            _slow.append(entry)
+    if entry is not None:
+        detail = f" {entry['detail']}" if entry['detail'] else ""
+        print(f"[느린 작업] {category} {name}: {ms:.1f}ms{detail}", file=sys.stderr)
+
+
+def timed(category, name=None):
+    """Decorator timing every call under (category, name or the function name).
+
+    Coroutine functions stay coroutine functions (Flet runs only those on its
+    event loop) and are timed until their coroutine finishes.
+    """
+    def decorate(func):
+        if not ENABLED:
+            return func
+        key = name or func.__name__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    record(category, key, time.perf_counter() - started,
+                           (args, kwargs) if args or kwargs else None)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(category, key, time.perf_counter() - started,
+                       (args, kwargs) if args or kwargs else None)
+        return wrapper
+    return decorate
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor timing execute calls and the fetches of their rows."""
+
+    _sql = None
+    _fetch = 0.0
+
+    def execute(self, sql, parameters=()):
+        self._sql = sql
+        self._fetch = 0.0
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            record('sql', _short(sql), time.perf_counter() - started,
+                   parameters if parameters else None)
+
+    def executemany(self, sql, seq_of_parameters):
+        self._sql = sql
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            record('sql', _short(sql), time.perf_counter() - started)
+
+    def _fetched(self, started):
+        if self._sql is not None:
+            record('sql.fetch', _short(self._sql), time.perf_counter() - started)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            self._fetched(started)
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        try:
+            return super().fetchmany(self.arraysize if size is None else size)
+        finally:
+            self._fetched(started)
+
+    def fetchall(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            self._fetched(started)
+
+    def __next__(self):
+        # Row-by-row iteration is summed and recorded once, at the end
+        started = time.perf_counter()
+        try:
+            return super().__next__()
+        except StopIteration:
+            if self._sql is not None:
+                record('sql.fetch', _short(self._sql), self._fetch + time.perf_counter() - started)
+            raise
+        finally:
+            self._fetch += time.perf_counter() - started
+
+
+class TracedConnection(sqlite3.Connection):
+    """Connection whose statements all run through TracedCursor."""
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def connection_factory():
+    """The sqlite3 connection class to open connections with."""
+    return TracedConnection if ENABLED else sqlite3.Connection
+
+
+def snapshot():
+    """Histograms by category and name, plus the recent slow operations."""
+    with _lock:
+        operations = {}
+        for (category, name), histogram in _stats.items():
+            operations.setdefault(category, {})[name] = histogram.summary()
+        slow = list(_slow)
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'slow_ms': SLOW_MS,
+        'operations': operations,
+        'slow': slow,
+    }
+
+
+def export(path):
+    """Write snapshot() to path as JSON."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot(), f, ensure_ascii=False, indent=2)
+
+
+def reset():
+    """Drop every recorded timing."""
+    with _lock:
+        _stats.clear()
+        _slow.clear()
+
+
+if ENABLED and EXPORT_PATH:
+    atexit.register(export, EXPORT_PATH)
@@ -0,0 +1,118 @@
+"""
+Parser for the hanja.csv meaning field.
+The field is a nested list of quoted strings, one group per reading:
+    [[['집'], ['가']]]
+    [[['초'], ['초']], [['술권할'], ['작']]]
+Each group is [meanings, sounds] with the sounds list optional. The scanner
+below handles exactly that grammar without compiling the text the way
+ast.literal_eval does, and falls back to literal_eval for anything unusual
+(escapes, other quoting).
+"""
+import ast
+import re
+
+# Tokens: brackets, commas and quoted strings without escapes
+_TOKEN = re.compile(r"""\s*(?:(\[)|(\])|(,)|'([^'\\]*)'|"([^"\\]*)")""")
+
+
+class MeaningParseError(ValueError):
+    """Raised when a meaning field is not a list of [meanings, sounds] groups."""
+
+    def __init__(self, text, message):
+        super().__init__(f"{message}: {text!r}")
+        self.text = text
+
+
+def _scan(text):
+    """Parse nested lists of strings with the fast tokenizer."""
+    stack = [[]]
+    expect_value = True
+    pos = 0
+    end = len(text.rstrip())
+    while pos < end:
+        match = _TOKEN.match(text, pos)
+        if match is None:
+            raise MeaningParseError(text, f"unexpected character at {pos}")
+        pos = match.end()
+        if match.group(1):
+            if not expect_value:
+                raise MeaningParseError(text, f"missing comma at {match.start(1)}")
+            stack.append([])
+        elif match.group(2):
+            if len(stack) == 1:
+                raise MeaningParseError(text, f"unbalanced ']' at {match.start(2)}")
+            item = stack.pop()
+            stack[-1].append(item)
+            expect_value = False
+        elif match.group(3):
+            if expect_value:
+                raise MeaningParseError(text, f"unexpected ',' at {match.start(3)}")
+            expect_value = True
+        else:
+            if not expect_value:
+                raise MeaningParseError(text, f"missing comma at {match.start()}")
+            value = match.group(4)
+            stack[-1].append(value if value is not None else match.group(5))
+            expect_value = False
+    if len(stack) != 1 or len(stack[0]) != 1:
+        raise MeaningParseError(text, "expected exactly one top-level list")
+    return stack[0][0]
+
+
+def _groups(data, text):
+    """Validate parsed data and convert it to (meanings, sounds) tuples."""
+    if not isinstance(data, list):
+        raise MeaningParseError(text, "top level is not a list")
+    groups = []
+    for item in data:
+        if not isinstance(item, list) or not 1 <= len(item) <= 2:
+            raise MeaningParseError(text, "group is not [meanings, sounds]")
+        parts = []
+        for part in item:
+            if not isinstance(part, list) or not all(isinstance(s, str) for s in part):
+                raise MeaningParseError(text, "group part is not a list of strings")
+            parts.append(tuple(part))
+        if len(parts) == 1:
+            parts.append(())
+        groups.append(tuple(parts))
+    return tuple(groups)
+
+
+def parse_meaning_data(text):
+    """Parse a meaning field into a tuple of (meanings, sounds) groups.
+
+    Raises MeaningParseError if neither the fast scanner nor the
+    literal_eval fallback can read it.
+    """
+    try:
+        data = _scan(text)
+    except MeaningParseError:
+        try:
+            data = ast.literal_eval(text)
+        except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError) as e:
+            raise MeaningParseError(text, f"unparseable ({e.__class__.__name__})") from None
+    return _groups(data, text)
+
+
+def format_meaning(groups):
+    """Format groups as the display string, e.g. '초 [초] | 술권할 [작]'."""
+    parts = []
+    for meanings, sounds in groups:
+        meaning_text = ', '.join(meanings)
+        if sounds:
+            parts.append(f"{meaning_text} [{'/'.join(sounds)}]")
+        else:
+            parts.append(meaning_text)
+    return ' | '.join(parts)
+
+
+def split_display(meaning):
+    """Recover groups from a display string built by format_meaning."""
+    groups = []
+    for part in meaning.split(' | '):
+        text, sep, sounds = part.rpartition(' [')
+        if sep and sounds.endswith(']'):
+            groups.append((tuple(text.split(', ')), tuple(sounds[:-1].split('/'))))
+        else:
+            groups.append((tuple(part.split(', ')), ()))
+    return tuple(groups)
@@ -0,0 +1,111 @@
+"""
+Quiz builder.
+Generates every question of a quiz and its options in one batch when the quiz
+starts, so moving to the next question does no I/O. Distractors come from the
+question's own and neighbouring grades and never share a meaning or a reading
+with the correct answer.
+"""
+
+# Quiz modes: (label, prompt field, option field, question text)
+QUIZ_MODES = {
+    'meaning': ("한자 → 뜻", 'hanja', 'meaning', "이 한자의 뜻은?"),
+    'reverse_meaning': ("뜻 → 한자", 'meaning', 'hanja', "이 뜻의 한자는?"),
+    'sound': ("음 → 한자", 'main_sound', 'hanja', "이 음의 한자는?"),
+}
+
+# Draws per distractor before widening the pool to the whole catalog
+MAX_DRAWS = 50
+
+
+class Question:
+    """One pre-generated quiz question."""
+
+    __slots__ = ('hanja_id', 'hanja', 'prompt', 'answer', 'options')
+
+    def __init__(self, hanja_id, hanja, prompt, answer, options):
+        self.hanja_id = hanja_id
+        self.hanja = hanja
+        self.prompt = prompt
+        self.answer = answer
+        self.options = options
+
+
+class QuizPools:
+    """Per-catalog tables every quiz builder reads.
+
+    The meaning and reading sets of each row and the distractor pool of
+    each grade never change after loading, so one instance is built per
+    catalog and shared by every session's builder.
+    """
+
+    __slots__ = ('catalog', 'spread', 'senses', 'readings', 'pools')
+
+    def __init__(self, catalog, spread=1):
+        self.catalog = catalog
+        self.spread = spread
+        self.senses = tuple(frozenset(catalog.senses(pos)) for pos in range(len(catalog)))
+        self.readings = tuple(frozenset(catalog.readings(pos)) for pos in range(len(catalog)))
+        self.pools = {level: catalog.neighbour_range(level, spread) for level in catalog.levels}
+
+    def conflicts(self, pos, other):
+        """True if two rows share a meaning or a reading."""
+        return bool(self.senses[pos] & self.senses[other]
+                    or self.readings[pos] & self.readings[other])
+
+
+class QuizBuilder:
+    """Builds whole quizzes from a catalog through a Sampler.
+
+    Pass shared QuizPools to skip building them per builder; the sampler
+    (and so the random stream) stays the builder's own.
+    """
+
+    def __init__(self, sampler, spread=1, pools=None):
+        self.sampler = sampler
+        self.pools = QuizPools(sampler.catalog, spread) if pools is None else pools
+        self.spread = self.pools.spread
+
+    def _distractors(self, pos, field, count):
+        """Draw count option texts from pos's grade neighbourhood."""
+        catalog = self.sampler.catalog
+        values = getattr(catalog, field)
+        picked = []
+        seen = {values[pos]}
+        pool = self.pools.pools[catalog.level[pos]]
+        draws = 0
+        while len(picked) < count:
+            if draws == MAX_DRAWS * count:
+                # Tiny neighbourhood: fall back to every grade
+                pool = range(len(catalog))
+            if draws == 2 * MAX_DRAWS * count:
+                break
+            draws += 1
+            other = self.sampler.pick(pool)
+            if values[other] in seen or self.pools.conflicts(pos, other):
+                continue
+            seen.add(values[other])
+            picked.append(values[other])
+        return picked
+
+    def build(self, grade="", count=10, mode='meaning', option_count=4, weights=None):
+        """Generate count questions with option_count options each.
+
+        weights biases which hanja are asked, as in Sampler.sample_positions.
+        """
+        positions = self.sampler.sample_positions(grade, count, weights)
+        return self.build_for(positions, mode, option_count)
+
+    def build_for(self, positions, mode='meaning', option_count=4):
+        """Generate one question per catalog position, e.g. a review deck."""
+        _, prompt_field, option_field, _ = QUIZ_MODES[mode]
+        catalog = self.sampler.catalog
+        questions = []
+        for pos in positions:
+            answer = getattr(catalog, option_field)[pos]
+            options = self._distractors(pos, option_field, option_count - 1)
+            options.append(answer)
+            self.sampler.shuffle(options)
+            questions.append(Question(
+                catalog.ids[pos], catalog.hanja[pos], getattr(catalog, prompt_field)[pos], answer, options,
+            ))
+        return questions
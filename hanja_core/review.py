@@ -0,0 +1,459 @@
+"""
+Spaced-repetition scheduler (SM-2) backed by the progress table.
+Every answer is appended to progress and folded into review_state, one row
+per (client, hanja) holding the SM-2 repetitions, interval, ease and next
+due time. Building a review deck is then a range scan of the
+(client_id, due_at) index instead of a replay of the answer log.
+
+Answers are written behind: record() only queues the event and a writer
+thread, shared by every client of a database, commits queued events in
+grouped transactions on a WAL database, so the UI never waits for the disk. The same transactions keep progress_daily,
+correct/incorrect counts per (client, level, UTC day), up to date, so stats
+never aggregate the raw log; `python -m hanja_core.review --compact` then deletes raw
+answers older than the retention period. A write that finds the database
+locked is retried with backoff and, if it stays locked, kept for the next
+write.
+"""
+import argparse
+import atexit
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from .connections import DEFAULT_DB_PATH, ConnectionManager
+
+# SM-2 parameters
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+FIRST_INTERVAL = 1.0
+SECOND_INTERVAL = 6.0
+# A forgotten card comes back within the same session day
+LAPSE_DELAY = timedelta(minutes=10)
+
+# Answer quality on SM-2's 0-5 scale for a right / wrong answer
+QUALITY_CORRECT = 4
+QUALITY_INCORRECT = 1
+
+# Same text format as progress.created_at (CURRENT_TIMESTAMP, UTC)
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Write-behind: commit once this many answers are queued, or this many
+# seconds after the first queued answer
+FLUSH_SIZE = 64
+FLUSH_INTERVAL = 1.0
+
+# A write that finds the database locked or busy is retried this many
+# times, sleeping WRITE_BACKOFF seconds and doubling it in between
+WRITE_RETRIES = 3
+WRITE_BACKOFF = 0.05
+
+# Raw answers kept by compaction; older ones survive only in the rollups
+RETAIN_DAYS = 90
+
+# Queue markers for the writer thread
+_FLUSH = object()
+_STOP = object()
+
+
+def _is_transient(err):
+    """Whether a write failed only because another connection held the database."""
+    message = str(err).lower()
+    return isinstance(err, sqlite3.OperationalError) and ('locked' in message or 'busy' in message)
+
+
+def create_review_tables(conn):
+    """Create the review_state table and its due index if missing."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS review_state (
+            client_id TEXT NOT NULL,
+            hanja_id INTEGER NOT NULL,
+            repetitions INTEGER NOT NULL,
+            interval_days REAL NOT NULL,
+            ease REAL NOT NULL,
+            due_at TIMESTAMP NOT NULL,
+            reviewed_at TIMESTAMP NOT NULL,
+            PRIMARY KEY (client_id, hanja_id),
+            FOREIGN KEY (hanja_id) REFERENCES hanja(id)
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_review_state_due ON review_state(client_id, due_at)')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS progress_daily (
+            client_id TEXT NOT NULL,
+            level TEXT NOT NULL,
+            day TEXT NOT NULL,
+            correct INTEGER NOT NULL DEFAULT 0,
+            incorrect INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (client_id, level, day)
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_progress_created ON progress(created_at)')
+
+
+def add_to_rollups(conn, counts):
+    """Add {(client_id, level, day): [correct, incorrect]} to progress_daily."""
+    conn.executemany('''
+        INSERT INTO progress_daily (client_id, level, day, correct, incorrect)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (client_id, level, day) DO UPDATE SET
+            correct = correct + excluded.correct,
+            incorrect = incorrect + excluded.incorrect
+    ''', [(*key, correct, incorrect) for key, (correct, incorrect) in counts.items()])
+
+
+def rebuild_rollups(conn, client_id):
+    """Recount one client's progress_daily rows from the raw answer log."""
+    conn.execute('DELETE FROM progress_daily WHERE client_id = ?', (client_id,))
+    conn.execute('''
+        INSERT INTO progress_daily (client_id, level, day, correct, incorrect)
+        SELECT p.client_id, h.level, substr(p.created_at, 1, 10),
+               SUM(p.result = 'correct'), SUM(p.result = 'incorrect')
+        FROM progress p JOIN hanja h ON h.id = p.hanja_id
+        WHERE p.client_id = ?
+        GROUP BY p.client_id, h.level, substr(p.created_at, 1, 10)
+    ''', (client_id,))
+
+
+def rebuild_review_state(conn, client_id):
+    """Replay one client's answer log into review_state."""
+    states = {}
+    cursor = conn.execute(
+        'SELECT hanja_id, result, created_at FROM progress WHERE client_id = ? ORDER BY id',
+        (client_id,))
+    for hanja_id, result, created_at in cursor:
+        now = datetime.strptime(created_at, TIME_FORMAT)
+        state = states.get(hanja_id)
+        repetitions, interval, ease, due_at = schedule(
+            state[:3] if state else None, result == 'correct', now)
+        states[hanja_id] = (repetitions, interval, ease, due_at, now)
+    conn.execute('DELETE FROM review_state WHERE client_id = ?', (client_id,))
+    conn.executemany(
+        'INSERT INTO review_state VALUES (?, ?, ?, ?, ?, ?, ?)',
+        [(client_id, hanja_id, repetitions, interval, ease,
+          due_at.strftime(TIME_FORMAT), reviewed_at.strftime(TIME_FORMAT))
+         for hanja_id, (repetitions, interval, ease, due_at, reviewed_at) in states.items()])
+
+
+def _needs_rebuild(conn, table, client_id):
+    """True if answers exist for a client but table has nothing for it yet."""
+    if conn.execute(f'SELECT 1 FROM {table} WHERE client_id = ? LIMIT 1', (client_id,)).fetchone():
+        return False
+    return bool(conn.execute(
+        'SELECT 1 FROM progress WHERE client_id = ? LIMIT 1', (client_id,)).fetchone())
+
+
+def fold_in_log(conn, client_id):
+    """Build a client's review_state and progress_daily rows from its log where it has none.
+
+    Answers logged before those tables existed (or by an older app) are
+    only counted there once this has run for their client.
+    """
+    if _needs_rebuild(conn, 'review_state', client_id):
+        rebuild_review_state(conn, client_id)
+    if _needs_rebuild(conn, 'progress_daily', client_id):
+        rebuild_rollups(conn, client_id)
+
+
+def compact(conn, retain_days=RETAIN_DAYS, now=None):
+    """Delete raw answers older than retain_days; return how many were removed.
+
+    Answers written by ProgressWriter are counted in progress_daily and
+    review_state as they are written. Clients whose log was never folded
+    into those tables are folded in first, in the same transaction, so no
+    client loses the deleted answers from its stats or schedule.
+    """
+    cutoff = ((now or utc_now()) - timedelta(days=retain_days)).strftime(TIME_FORMAT)
+    with conn:
+        clients = [row[0] for row in conn.execute(
+            'SELECT DISTINCT client_id FROM progress WHERE created_at < ?', (cutoff,))]
+        for client_id in clients:
+            fold_in_log(conn, client_id)
+        return conn.execute('DELETE FROM progress WHERE created_at < ?', (cutoff,)).rowcount
+
+
+def level_stats(conn, client_id, days=7, now=None):
+    """Return [(level, correct, incorrect)] over the last days UTC days, in level order.
+
+    Reads at most one rollup row per level and day, however long the history.
+    """
+    since = ((now or utc_now()) - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+    return conn.execute('''
+        SELECT d.level, SUM(d.correct), SUM(d.incorrect)
+        FROM progress_daily d
+        LEFT JOIN (SELECT level, MIN(level_order) AS level_order FROM hanja GROUP BY level) o
+            ON o.level = d.level
+        WHERE d.client_id = ? AND d.day >= ?
+        GROUP BY d.level
+        ORDER BY o.level_order
+    ''', (client_id, since)).fetchall()
+
+
+def utc_now():
+    """Current UTC time without tzinfo, matching CURRENT_TIMESTAMP."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def schedule(state, correct, now):
+    """Apply one SM-2 review to state (repetitions, interval_days, ease).
+
+    Returns the new (repetitions, interval_days, ease, due_at).
+    """
+    repetitions, interval, ease = state or (0, 0.0, INITIAL_EASE)
+    quality = QUALITY_CORRECT if correct else QUALITY_INCORRECT
+    ease = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    if correct:
+        if repetitions == 0:
+            interval = FIRST_INTERVAL
+        elif repetitions == 1:
+            interval = SECOND_INTERVAL
+        else:
+            interval = round(interval * ease, 2)
+        repetitions += 1
+        due_at = now + timedelta(days=interval)
+    else:
+        repetitions = 0
+        interval = 0.0
+        due_at = now + LAPSE_DELAY
+    return repetitions, interval, ease, due_at
+
+
+class ProgressWriter:
+    """Writer thread committing queued answers of every client in grouped transactions.
+
+    There is one per database. Its lock guards the shared writer connection
+    of a ConnectionManager, which schedulers also take for their deck
+    queries. close() commits what is queued; it also runs at interpreter exit.
+    """
+
+    def __init__(self, connections):
+        self.conn = connections.writer()
+        self.lock = threading.Lock()
+        self._queue = queue.Queue()
+        # Answers of a write that failed on a busy database, oldest first
+        self._pending = []
+        self._thread = threading.Thread(target=self._run, name='progress-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, client_id, hanja_id, correct, now):
+        """Queue one answer."""
+        self._queue.put((client_id, hanja_id, correct, now))
+
+    def _run(self):
+        """Writer thread: commit queued answers in groups until stopped."""
+        while True:
+            # A batch kept after a failed write is retried on the next tick
+            try:
+                item = self._queue.get(timeout=FLUSH_INTERVAL if self._pending else None)
+            except queue.Empty:
+                item = None
+            taken = 0 if item is None else 1
+            batch = []
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            while item is not None and item is not _FLUSH and item is not _STOP:
+                batch.append(item)
+                item = None
+                if len(batch) >= FLUSH_SIZE:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                taken += 1
+            batch = self._pending + batch
+            if batch:
+                self._write(batch, final=item is _STOP)
+            for _ in range(taken):
+                self._queue.task_done()
+            if item is _STOP:
+                return
+
+    def _write(self, batch, final=False):
+        """Commit a batch, retrying with backoff while the database is busy.
+
+        A batch still blocked after WRITE_RETRIES is kept for the next write
+        unless the writer is stopping; other errors drop it. Failures are
+        reported on stderr.
+        """
+        delay = WRITE_BACKOFF
+        for attempt in range(WRITE_RETRIES + 1):
+            try:
+                self._commit(batch)
+            except sqlite3.Error as err:
+                error = err
+                if not _is_transient(err):
+                    break
+                if attempt < WRITE_RETRIES:
+                    time.sleep(delay)
+                    delay *= 2
+            else:
+                self._pending = []
+                return
+        if _is_transient(error) and not final:
+            self._pending = batch
+            print(f"학습 기록 {len(batch)}건을 저장하지 못해 나중에 다시 시도합니다: {error}",
+                  file=sys.stderr)
+        else:
+            self._pending = []
+            print(f"학습 기록을 저장하지 못했습니다 ({len(batch)}건): {error}", file=sys.stderr)
+
+    def _commit(self, batch):
+        """Append a batch of answers to progress and fold them into review_state."""
+        progress_rows = []
+        # (client_id, hanja_id) -> (repetitions, interval_days, ease, due_at, reviewed_at)
+        states = {}
+        # (client_id, level, day) -> [correct, incorrect]
+        counts = {}
+        with self.lock, self.conn:
+            ids = {hanja_id for _, hanja_id, _, _ in batch}
+            levels = dict(self.conn.execute(
+                f'SELECT id, level FROM hanja WHERE id IN ({",".join("?" * len(ids))})',
+                tuple(ids)))
+            for client_id, hanja_id, correct, now in batch:
+                stamp = now.strftime(TIME_FORMAT)
+                progress_rows.append((client_id, hanja_id,
+                                      'correct' if correct else 'incorrect', stamp))
+                key = (client_id, hanja_id)
+                if key in states:
+                    state = states[key][:3]
+                else:
+                    state = self.conn.execute(
+                        'SELECT repetitions, interval_days, ease FROM review_state '
+                        'WHERE client_id = ? AND hanja_id = ?', key).fetchone()
+                repetitions, interval, ease, due_at = schedule(state, correct, now)
+                states[key] = (repetitions, interval, ease,
+                               due_at.strftime(TIME_FORMAT), stamp)
+                if hanja_id in levels:
+                    day = (client_id, levels[hanja_id], stamp[:10])
+                    counts.setdefault(day, [0, 0])[0 if correct else 1] += 1
+            self.conn.executemany(
+                'INSERT INTO progress (client_id, hanja_id, result, created_at) '
+                'VALUES (?, ?, ?, ?)', progress_rows)
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO review_state VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(*key, *state) for key, state in states.items()])
+            add_to_rollups(self.conn, counts)
+
+    def flush(self):
+        """Block until every queued answer is committed (or kept, if the database stays locked)."""
+        if not self._thread.is_alive():
+            return
+        self._queue.put(_FLUSH)
+        self._queue.join()
+
+    def close(self):
+        """Commit the queued answers and stop the writer thread."""
+        if not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        atexit.unregister(self.close)
+
+
+class ReviewScheduler:
+    """Records answers and builds due decks for one client.
+
+    Answers go through a ProgressWriter; pass a shared one when many
+    clients use the same database (a server), otherwise the scheduler
+    starts and closes its own.
+    """
+
+    def __init__(self, connections, client_id, writer=None):
+        self.client_id = client_id
+        self._owns_writer = writer is None
+        self._writer = ProgressWriter(connections) if writer is None else writer
+        self._conn = self._writer.conn
+        self._lock = self._writer.lock
+        with self._lock, self._conn:
+            create_review_tables(self._conn)
+            fold_in_log(self._conn, self.client_id)
+
+    def record(self, hanja_id, correct, now=None):
+        """Queue one answer; the writer thread logs it and reschedules the hanja."""
+        self._writer.record(self.client_id, hanja_id, correct, now or utc_now())
+
+    def flush(self):
+        """Block until every queued answer is committed."""
+        self._writer.flush()
+
+    def due(self, grade="", limit=20, now=None):
+        """Return the ids of hanja due by now, most overdue first."""
+        self.flush()
+        stamp = (now or utc_now()).strftime(TIME_FORMAT)
+        if grade and grade != "전체":
+            query = ('SELECT r.hanja_id FROM review_state r JOIN hanja h ON h.id = r.hanja_id '
+                     'WHERE r.client_id = ? AND r.due_at <= ? AND h.level = ? '
+                     'ORDER BY r.due_at LIMIT ?')
+            params = (self.client_id, stamp, grade, limit)
+        else:
+            query = ('SELECT hanja_id FROM review_state WHERE client_id = ? AND due_at <= ? '
+                     'ORDER BY due_at LIMIT ?')
+            params = (self.client_id, stamp, limit)
+        with self._lock:
+            return [row[0] for row in self._conn.execute(query, params)]
+
+    def weights(self):
+        """Map each hanja the client has answered to a random-draw weight.
+
+        Every lapse lowers SM-2 ease, so (INITIAL_EASE / ease) ** 2 is 1.0
+        for hanja always answered right and grows up to about 3.7 for the
+        most missed ones; unseen hanja keep the sampler's default of 1.0.
+        """
+        self.flush()
+        with self._lock:
+            return {hanja_id: (INITIAL_EASE / ease) ** 2 for hanja_id, ease in self._conn.execute(
+                'SELECT hanja_id, ease FROM review_state WHERE client_id = ?', (self.client_id,))}
+
+    def level_stats(self, days=7, now=None):
+        """Correct/incorrect counts per level over the last days days."""
+        self.flush()
+        with self._lock:
+            return level_stats(self._conn, self.client_id, days, now)
+
+    def compact(self, retain_days=RETAIN_DAYS, now=None):
+        """Commit queued answers, then drop raw answers older than retain_days."""
+        self.flush()
+        with self._lock:
+            return compact(self._conn, retain_days, now)
+
+    def close(self):
+        """Commit the queued answers, and stop the writer if the scheduler started it."""
+        if self._owns_writer:
+            self._writer.close()
+        else:
+            self._writer.flush()
+
+
+def main():
+    """Print a client's weekly stats, or compact the answer log."""
+    parser = argparse.ArgumentParser(description="학습 기록 통계 및 정리")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="데이터베이스 경로")
+    parser.add_argument('--client', default=os.environ.get('MAKING_HANJA_CLIENT_ID', 'desktop'),
+                        help="학습자 ID")
+    parser.add_argument('--days', type=int, default=7, help="통계 기간 (일)")
+    parser.add_argument('--compact', action='store_true',
+                        help="보존 기간이 지난 답안 원본 삭제 (모든 학습자, 집계에 먼저 반영)")
+    parser.add_argument('--retain-days', type=int, default=RETAIN_DAYS, help="답안 원본 보존 기간 (일)")
+    args = parser.parse_args()
+
+    connections = ConnectionManager(args.db)
+    scheduler = ReviewScheduler(connections, args.client)
+    try:
+        if args.compact:
+            removed = scheduler.compact(args.retain_days)
+            print(f"{args.retain_days}일 지난 답안 {removed:,}건을 일별 집계로 정리했습니다 (모든 학습자)")
+        print(f"\n최근 {args.days}일 급수별 정답률 ({args.client}):")
+        for level, correct, incorrect in scheduler.level_stats(args.days):
+            total = correct + incorrect
+            print(f"  {level}: {correct}/{total} ({correct / total:.0%})")
+    finally:
+        scheduler.close()
+        connections.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Random sampling over the in-memory catalog.
+Replaces ORDER BY RANDOM(): each grade is a contiguous run of catalog
+positions, so a draw of k items costs O(k) instead of a random key and a
+sort per row. Draws can be weighted, e.g. toward hanja a learner keeps
+missing.
+"""
+import heapq
+import random
+
+
+class Sampler:
+    """Draws hanja from a catalog.
+
+    Pass a seed to make a session's draws reproducible.
+    """
+
+    def __init__(self, catalog, seed=None):
+        self.catalog = catalog
+        self.seed = seed
+        self._rng = random.Random(seed)
+
+    def sample_positions(self, grade="", count=10, weights=None):
+        """Draw up to count distinct catalog positions from a grade.
+
+        weights optionally maps hanja id to a relative weight (e.g. how often
+        the learner missed it); ids not in the mapping weigh 1.0 and ids
+        weighing 0 are never drawn. Uniform draws are O(count); weighted draws
+        use Efraimidis-Spirakis keys and are O(n log count) over the grade.
+        """
+        positions = self.catalog.level_range(grade)
+        if not weights:
+            return self._rng.sample(positions, min(count, len(positions)))
+        ids = self.catalog.ids
+        rng = self._rng
+        keyed = []
+        for pos in positions:
+            weight = weights.get(ids[pos], 1.0)
+            if weight > 0:
+                keyed.append((rng.random() ** (1.0 / weight), pos))
+        return [pos for _, pos in heapq.nlargest(count, keyed)]
+
+    def sample(self, grade="", count=10, weights=None):
+        """Draw up to count distinct rows from a grade."""
+        row = self.catalog.row
+        return [row(pos) for pos in self.sample_positions(grade, count, weights)]
+
+    def pick(self, population):
+        """Draw one element of a sequence."""
+        return population[self._rng.randrange(len(population))]
+
+    def shuffle(self, items):
+        """Shuffle a list in place with the session's generator."""
+        self._rng.shuffle(items)
@@ -0,0 +1,100 @@
+"""
+Inverted index for the hanja list search.
+Maps every character unigram and bigram of hanja, main_sound and the
+individual meanings/readings to the catalog positions containing it, so a
+substring query touches only the posting lists of its own grams instead of
+scanning every row.
+"""
+from array import array
+from bisect import bisect_left
+from itertools import islice
+
+
+class SearchIndex:
+    """Unigram/bigram inverted index over catalog positions.
+
+    Each field is a sequence indexed by position whose values are either a
+    string or a tuple of strings (e.g. every meaning of a row).
+    """
+
+    __slots__ = ('_fields', '_postings')
+
+    def __init__(self, *fields):
+        self._fields = fields
+        postings = {}
+        for pos, values in enumerate(zip(*fields)):
+            grams = set()
+            for text in self._texts(values):
+                grams.update(text)
+                grams.update(text[i:i + 2] for i in range(len(text) - 1))
+            for gram in grams:
+                posting = postings.get(gram)
+                if posting is None:
+                    posting = postings[gram] = array('i')
+                posting.append(pos)
+        self._postings = postings
+
+    @staticmethod
+    def _texts(values):
+        """Flatten one position's field values into strings."""
+        for value in values:
+            if isinstance(value, str):
+                yield value
+            else:
+                yield from value
+
+    def _candidates(self, query):
+        """Return positions whose fields contain every bigram of query."""
+        if len(query) == 1:
+            return self._postings.get(query, ())
+        grams = {query[i:i + 2] for i in range(len(query) - 1)}
+        lists = []
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if posting is None:
+                return ()
+            lists.append(posting)
+        lists.sort(key=len)
+        if len(lists) == 1:
+            return lists[0]
+        # Intersect starting from the rarest gram to keep the working set small
+        matched = set(lists[0])
+        for posting in lists[1:]:
+            matched.intersection_update(posting)
+            if not matched:
+                return ()
+        return sorted(matched)
+
+    def search(self, query):
+        """Return ascending positions where any field contains query."""
+        candidates = self._candidates(query)
+        if len(query) <= 2:
+            # Unigram and bigram postings are exact per field
+            return candidates
+        # Longer queries need a substring check: bigrams may be non-contiguous
+        fields = self._fields
+        return [
+            pos for pos in candidates
+            if any(query in text for text in self._texts(field[pos] for field in fields))
+        ]
+
+    def iter_search(self, query, start=0, stop=None):
+        """Yield ascending positions in [start, stop) where any field contains query.
+
+        Walks only the rarest gram's posting list, so the first matches are
+        available without computing the full result.
+        """
+        # Unigram and bigram postings are exact per field; longer queries
+        # walk their rarest bigram and check each candidate
+        exact = len(query) <= 2
+        if exact:
+            posting = self._postings.get(query, ())
+        else:
+            posting = min((self._postings.get(query[i:i + 2], ()) for i in range(len(query) - 1)),
+                          key=len)
+        fields = self._fields
+        for pos in islice(posting, bisect_left(posting, start), None):
+            if stop is not None and pos >= stop:
+                return
+            if exact or any(query in text for text in self._texts(field[pos] for field in fields)):
+                yield pos
@@ -0,0 +1,240 @@
+"""
+Study sessions.
+Each session holds one learner's state for one screen and nothing else; the
+catalog, quiz builder and scheduler they read from are passed in, so the
+same sessions run under the desktop app, a server or a load test.
+"""
+import threading
+
+from .window_source import WindowedSource
+
+
+def review_positions(catalog, scheduler, grade="", limit=20):
+    """Catalog positions of the hanja due for review, most overdue first."""
+    positions = (catalog.position(hanja_id) for hanja_id in scheduler.due(grade, limit))
+    return [pos for pos in positions if pos is not None]
+
+
+def review_weights(scheduler):
+    """Draw weights for a random deck: hanja the learner misses come up more often."""
+    return scheduler.weights() if scheduler is not None else None
+
+
+class ListSession:
+    """Filtered, paged view of the catalog.
+
+    Paging from the current page uses keyset cursors, so next/prev cost a
+    binary search however deep the page is.
+    """
+
+    def __init__(self, catalog, per_page=20):
+        self.catalog = catalog
+        self.per_page = per_page
+        self.grade = ""
+        self.query = ""
+        # Browse filters: radical ("" for any) and total strokes (None for any)
+        self.radical = ""
+        self.total_strokes = None
+        self.rows = []
+        self.total = 0
+        self.page_num = 1
+        self._cursors = None
+
+    @property
+    def results(self):
+        """The cached ResultSet of the current filter."""
+        return self.results_for(self.query)
+
+    def results_for(self, query):
+        """The cached ResultSet of the current grade and browse filters with query."""
+        return self.catalog.results(self.grade, query, self.radical, self.total_strokes)
+
+    @property
+    def total_pages(self):
+        return max(1, (self.total + self.per_page - 1) // self.per_page)
+
+    def load(self, grade=None, query=None, page_num=1):
+        """Change the filter (None keeps it) and show a page by number."""
+        if grade is not None:
+            self.grade = grade
+        if query is not None:
+            self.query = query
+        self._show(self.results, (page_num - 1) * self.per_page)
+
+    def _show(self, results, offset):
+        """Show the page of a result set starting at offset."""
+        per_page = self.per_page
+        last_page_offset = max(0, (len(results) - 1) // per_page * per_page)
+        offset = max(0, min(offset, last_page_offset))
+        self.rows = results.rows(offset, per_page)
+        self.total = len(results)
+        self.page_num = offset // per_page + 1
+        if self.rows:
+            self._cursors = (results.key(offset), results.key(offset + len(self.rows) - 1))
+        else:
+            self._cursors = None
+
+    def next_page(self):
+        """Move to the page after the current one; return False at the end."""
+        if self.page_num >= self.total_pages or not self._cursors:
+            return False
+        results = self.results
+        self._show(results, results.seek(self._cursors[1]))
+        return True
+
+    def prev_page(self):
+        """Move to the page before the current one; return False at the start."""
+        if self.page_num <= 1 or not self._cursors:
+            return False
+        results = self.results
+        self._show(results, results.seek(self._cursors[0], after=False) - self.per_page)
+        return True
+
+    def preview(self, query):
+        """First page of matches for query, without changing the session."""
+        return self.catalog.preview(self.grade, query, self.per_page,
+                                    self.radical, self.total_strokes)
+
+    def window(self):
+        """A chunked row source over the current filter, for full scrolling."""
+        return WindowedSource(self.results)
+
+
+class FlashcardSession:
+    """A deck of flashcards and the position in it."""
+
+    def __init__(self, builder, scheduler=None):
+        self.builder = builder
+        self.scheduler = scheduler
+        self.cards = []
+        self.index = 0
+        self.show_answer = False
+        # Indexes of the cards of this deck that have been graded
+        self.graded = set()
+        # Flet runs click handlers on worker threads: a double click must not
+        # grade a card twice
+        self._lock = threading.Lock()
+
+    @property
+    def current(self):
+        return self.cards[self.index] if self.cards else None
+
+    @property
+    def is_graded(self):
+        return self.index in self.graded
+
+    def start(self, grade="", deck='random', count=20):
+        """Deal a random or due-for-review deck; return False if it is empty."""
+        if deck == 'review':
+            catalog = self.builder.sampler.catalog
+            cards = [catalog.row(pos)
+                     for pos in review_positions(catalog, self.scheduler, grade, count)]
+            if not cards:
+                return False
+        else:
+            cards = self.builder.sampler.sample(grade, count, review_weights(self.scheduler))
+        self.cards = cards
+        self.index = 0
+        self.show_answer = False
+        self.graded = set()
+        return True
+
+    def flip(self):
+        self.show_answer = not self.show_answer
+
+    def move(self, step):
+        """Move step cards; return False if that leaves the deck."""
+        index = self.index + step
+        if not 0 <= index < len(self.cards):
+            return False
+        self.index = index
+        self.show_answer = False
+        return True
+
+    def grade(self, known):
+        """Record whether the learner knew the card; return False on the last card.
+
+        Each card is recorded once per deck; grading it again only moves on.
+        """
+        with self._lock:
+            if self.cards and not self.is_graded:
+                self.graded.add(self.index)
+                if self.scheduler is not None:
+                    self.scheduler.record(self.current['id'], known)
+            return self.move(1)
+
+
+class QuizSession:
+    """A pre-built quiz, the current question and the score."""
+
+    def __init__(self, builder, scheduler=None, option_count=4):
+        self.builder = builder
+        self.scheduler = scheduler
+        self.option_count = option_count
+        self.mode = 'meaning'
+        self.questions = []
+        self.index = 0
+        self.score = 0
+        # None until the current question is answered, then True/False
+        self.correct = None
+        # Guards answer() against a double click answering twice
+        self._lock = threading.Lock()
+
+    @property
+    def current(self):
+        return self.questions[self.index] if self.in_progress else None
+
+    @property
+    def in_progress(self):
+        return self.index < len(self.questions)
+
+    @property
+    def finished(self):
+        return bool(self.questions) and not self.in_progress
+
+    def start(self, grade="", deck='random', mode=None, count=10):
+        """Build a random or due-for-review quiz; return False if it is empty."""
+        if mode is not None:
+            self.mode = mode
+        if deck == 'review':
+            positions = review_positions(self.builder.sampler.catalog, self.scheduler, grade, count)
+            if not positions:
+                return False
+            questions = self.builder.build_for(positions, self.mode, self.option_count)
+        else:
+            questions = self.builder.build(grade, count, self.mode, self.option_count,
+                                           review_weights(self.scheduler))
+        self.questions = questions
+        self.index = 0
+        self.score = 0
+        self.correct = None
+        return True
+
+    def answer(self, option):
+        """Check an option against the current question and record it.
+
+        Only the first answer to a question counts; later ones, and answers
+        after the quiz has ended, return the recorded result (None if none).
+        """
+        with self._lock:
+            if not self.in_progress or self.correct is not None:
+                return self.correct
+            question = self.current
+            self.correct = option == question.answer
+            if self.correct:
+                self.score += 1
+            if self.scheduler is not None:
+                self.scheduler.record(question.hanja_id, self.correct)
+            return self.correct
+
+    def next(self):
+        """Move to the next question once the current one is answered.
+
+        Returns False otherwise, so a double click cannot skip a question.
+        """
+        with self._lock:
+            if not self.in_progress or self.correct is None:
+                return False
+            self.index += 1
+            self.correct = None
+            return True
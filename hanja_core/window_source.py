@@ -0,0 +1,76 @@
+"""
+Windowed row source for the virtualized hanja list.
+Serves rows of a catalog ResultSet in fixed-size chunks, keeps only a few
+chunks around, and builds the chunk after the visible window on a background
+thread so scrolling forward rarely waits.
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Rows per chunk and chunks kept per source
+CHUNK_SIZE = 50
+MAX_CHUNKS = 8
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """Get the shared single-thread prefetch executor."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='prefetch')
+    return _executor
+
+
+class WindowedSource:
+    """Chunked, bounded-memory access to the rows of a ResultSet."""
+
+    def __init__(self, results, chunk_size=CHUNK_SIZE, max_chunks=MAX_CHUNKS):
+        self.results = results
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+        self._chunks = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.results)
+
+    def _chunk(self, index):
+        """Return the rows of one chunk, building and caching it if needed."""
+        with self._lock:
+            rows = self._chunks.get(index)
+            if rows is not None:
+                self._chunks.move_to_end(index)
+                return rows
+        rows = self.results.rows(index * self.chunk_size, self.chunk_size)
+        with self._lock:
+            self._chunks[index] = rows
+            self._chunks.move_to_end(index)
+            while len(self._chunks) > self.max_chunks:
+                self._chunks.popitem(last=False)
+        return rows
+
+    def rows(self, start, stop):
+        """Return the rows at offsets start..stop-1."""
+        stop = min(stop, len(self))
+        if start >= stop:
+            return []
+        first, last = start // self.chunk_size, (stop - 1) // self.chunk_size
+        rows = []
+        for index in range(first, last + 1):
+            rows.extend(self._chunk(index))
+        base = first * self.chunk_size
+        return rows[start - base:stop - base]
+
+    def prefetch(self, start):
+        """Build the chunk containing offset start in the background."""
+        if start >= len(self):
+            return
+        index = start // self.chunk_size
+        with self._lock:
+            if index in self._chunks:
+                return
+        _get_executor().submit(self._chunk, index)
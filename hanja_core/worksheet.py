@@ -0,0 +1,510 @@
+"""
+Writing-practice worksheet renderer.
+Draws worksheets with reportlab independently of the desktop UI, and builds
+batches of reproducible worksheets in parallel from the command line:
+    python -m hanja_core.worksheet --grade 8급 --grade 7급 --sheets 30 --seed 2025
+Every sheet draws its characters from its own seed (batch seed, grade and
+sheet number), so any single sheet can be rebuilt on its own. --workbook
+prints every character of the chosen grades instead:
+    python -m hanja_core.worksheet --workbook --grade 특급 --volume-pages 100
+"""
+import argparse
+import os
+import threading
+import time
+from datetime import datetime
+from itertools import islice
+from multiprocessing import Pool
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+from reportlab.pdfgen import canvas
+
+from .catalog import HanjaCatalog
+from .connections import DEFAULT_DB_PATH
+from .sampling import Sampler
+
+# CJK font for PDF, registered on first use
+CJK_FONT = 'HYSMyeongJo-Medium'
+
+# Grid layouts: (label, cell size in mm, guide, repeats per row)
+LAYOUTS = {
+    'standard': ("田자 안내선 · 18mm × 10칸", 18, 'cross', 10),
+    'star': ("米자 안내선 · 18mm × 10칸", 18, 'star', 10),
+    'large': ("田자 안내선 · 24mm × 5칸", 24, 'cross', 5),
+    'compact': ("米자 안내선 · 14mm × 9칸", 14, 'star', 9),
+    'plain': ("안내선 없음 · 18mm × 10칸", 18, 'none', 10),
+}
+DEFAULT_LAYOUT = 'standard'
+
+# Page geometry: left margin, hanja/reading/meaning column, lowest row
+LEFT_MARGIN = 15 * mm
+INFO_WIDTH = 55 * mm
+BOTTOM_Y = 25 * mm
+
+# Whole-grade workbooks: first row below the page header, index font size
+WORKBOOK_TOP = 40 * mm
+INDEX_FONT_SIZE = 9
+
+# Batch defaults
+DEFAULT_COUNT = 10
+
+_font_registered = False
+_font_lock = threading.Lock()
+
+
+class PdfCancelled(Exception):
+    """Raised by render_worksheet when the cancel event is set."""
+
+
+def register_cjk_font():
+    """Register the CJK font once per process."""
+    global _font_registered
+    with _font_lock:
+        if not _font_registered:
+            pdfmetrics.registerFont(UnicodeCIDFont(CJK_FONT))
+            _font_registered = True
+
+
+class GridTemplates:
+    """Practice cell and row forms of one canvas.
+
+    Each distinct cell and row is drawn once as a PDF form XObject and then
+    stamped with doForm, so a page costs one reference per row instead of
+    a rectangle, guide lines and state changes per cell.
+    """
+
+    __slots__ = ('canvas', '_rows')
+
+    def __init__(self, c):
+        self.canvas = c
+        self._rows = {}
+
+    def _cell(self, cell_size, guide):
+        """Define the form of one practice box with its guide lines."""
+        c = self.canvas
+        name = f"cell-{guide}-{cell_size:g}"
+        if c.hasForm(name):
+            return name
+        size = (cell_size - 2) * mm
+        c.beginForm(name, 0, 0, size, size)
+        c.setStrokeColorRGB(0.7, 0.7, 0.7)
+        c.setLineWidth(0.5)
+        c.rect(0, 0, size, size)
+        if guide != 'none':
+            c.setStrokeColorRGB(0.85, 0.85, 0.85)
+            c.setDash(2, 2)
+            c.line(0, size / 2, size, size / 2)
+            c.line(size / 2, 0, size / 2, size)
+            if guide == 'star':
+                c.line(0, 0, size, size)
+                c.line(0, size, size, 0)
+        c.endForm()
+        return name
+
+    def row(self, cell_size, guide, cells):
+        """Return the form name of a row of cells boxes, defining it once."""
+        key = (cell_size, guide, cells)
+        name = self._rows.get(key)
+        if name is None:
+            c = self.canvas
+            cell = self._cell(cell_size, guide)
+            name = f"row-{guide}-{cell_size:g}-{cells}"
+            c.beginForm(name, 0, 0, cells * cell_size * mm, cell_size * mm)
+            for i in range(cells):
+                c.saveState()
+                c.translate(i * cell_size * mm, 0)
+                c.doForm(cell)
+                c.restoreState()
+            c.endForm()
+            self._rows[key] = name
+        return name
+
+
+def _row_cells(cell_size, repeat, width):
+    """Number of practice boxes that fit in a row, up to repeat."""
+    grid_start_x = LEFT_MARGIN + INFO_WIDTH
+    cells = 0
+    for i in range(repeat):
+        if grid_start_x + (i + 1) * cell_size > width - 10 * mm:
+            break
+        cells += 1
+    return cells
+
+
+def _draw_entry(c, hanja, row_y, grid_form):
+    """Draw one character's info column and its stamped practice row."""
+    c.setFont(CJK_FONT, 8)
+    c.drawString(LEFT_MARGIN, row_y + 12 * mm, f"[{hanja['level']}]")
+
+    c.setFont(CJK_FONT, 28)
+    c.drawString(LEFT_MARGIN, row_y - 2 * mm, hanja['hanja'])
+
+    c.setFont(CJK_FONT, 9)
+    c.drawString(LEFT_MARGIN + 22 * mm, row_y + 8 * mm, f"{hanja['main_sound']}")
+
+    c.drawString(LEFT_MARGIN + 22 * mm, row_y, hanja['short_meaning'])
+
+    if grid_form:
+        c.saveState()
+        c.translate(LEFT_MARGIN + INFO_WIDTH, row_y - 3 * mm)
+        c.doForm(grid_form)
+        c.restoreState()
+
+
+def _draw_footer(c, width):
+    """Draw the footer line of the current page."""
+    c.setFont(CJK_FONT, 8)
+    c.setFillColorRGB(0.5, 0.5, 0.5)
+    c.drawCentredString(width / 2, 10 * mm, "한자 학습 - 전국한자능력검정시험 대비")
+    c.setFillColorRGB(0, 0, 0)
+
+
+def _grid_form(c, layout, repeat=None):
+    """Return (cell size in mm, row form name or None) for a layout."""
+    _, cell_mm, guide, layout_repeat = LAYOUTS[layout]
+    cells = _row_cells(cell_mm * mm, layout_repeat if repeat is None else repeat, A4[0])
+    return cell_mm, GridTemplates(c).row(cell_mm, guide, cells) if cells else None
+
+
+def render_worksheet(path, hanja_data, grade="", repeat=None, progress=None, cancel=None,
+                     date=None, invariant=False, layout=DEFAULT_LAYOUT):
+    """Render a practice PDF for hanja_data (catalog row dicts) to path.
+
+    layout is a LAYOUTS key; repeat overrides its boxes per row, which are
+    capped by the page width.
+    progress(done, total, page_number) is called after each character.
+    Setting the cancel event stops rendering with PdfCancelled. date is the
+    header date text (today if None); invariant drops reportlab's timestamp
+    and document id so the same input gives byte-identical files.
+    """
+    register_cjk_font()
+    c = canvas.Canvas(path, pagesize=A4, invariant=1 if invariant else 0)
+    width, height = A4
+
+    # Title
+    c.setFont(CJK_FONT, 16)
+    today = date or datetime.now().strftime("%Y년 %m월 %d일")
+    grade_text = f" ({grade})" if grade and grade != "전체" else ""
+    c.drawCentredString(width / 2, height - 30 * mm, f"일일 한자 쓰기 연습{grade_text}")
+    c.setFont(CJK_FONT, 10)
+    c.drawCentredString(width / 2, height - 38 * mm, today)
+
+    cell_mm, grid_form = _grid_form(c, layout, repeat)
+    row_y = height - 55 * mm
+    for idx, hanja in enumerate(hanja_data):
+        if cancel is not None and cancel.is_set():
+            raise PdfCancelled()
+
+        if row_y < BOTTOM_Y:
+            c.showPage()
+            row_y = height - 25 * mm
+
+        _draw_entry(c, hanja, row_y, grid_form)
+        row_y -= (cell_mm + 5) * mm
+
+        if progress:
+            progress(idx + 1, len(hanja_data), c.getPageNumber())
+
+    _draw_footer(c, width)
+    c.save()
+
+
+def workbook_rows_per_page(layout=DEFAULT_LAYOUT):
+    """Characters on each workbook page for a layout."""
+    step = (LAYOUTS[layout][1] + 5) * mm
+    return int((A4[1] - WORKBOOK_TOP - BOTTOM_Y) // step) + 1
+
+
+def _draw_running_head(c, title, first, last, page_number):
+    """Draw a workbook page header: title, page number and the range it covers."""
+    width, height = A4
+    c.setFont(CJK_FONT, 10)
+    c.drawString(LEFT_MARGIN, height - 15 * mm, title)
+    c.drawRightString(width - LEFT_MARGIN, height - 15 * mm, f"{page_number}쪽")
+    if first['level'] == last['level']:
+        span = f"{first['level']} · {first['main_sound']} ~ {last['main_sound']}"
+    else:
+        span = f"{first['level']} {first['main_sound']} ~ {last['level']} {last['main_sound']}"
+    c.setFont(CJK_FONT, 8)
+    c.setFillColorRGB(0.4, 0.4, 0.4)
+    c.drawString(LEFT_MARGIN, height - 21 * mm, span)
+    c.setFillColorRGB(0, 0, 0)
+    c.setStrokeColorRGB(0.7, 0.7, 0.7)
+    c.setLineWidth(0.5)
+    c.line(LEFT_MARGIN, height - 24 * mm, width - LEFT_MARGIN, height - 24 * mm)
+    _draw_footer(c, width)
+
+
+def _wrap(items, max_width):
+    """Group index items into lines no wider than max_width."""
+    separator = " · "
+    line = []
+    line_width = 0
+    for item in items:
+        item_width = pdfmetrics.stringWidth(item + separator, CJK_FONT, INDEX_FONT_SIZE)
+        if line and line_width + item_width > max_width:
+            yield separator.join(line)
+            line, line_width = [], 0
+        line.append(item)
+        line_width += item_width
+    if line:
+        yield separator.join(line)
+
+
+def _draw_index(c, title, index, page_number):
+    """Draw the index pages: each grade's page span and where each reading starts."""
+    width, height = A4
+    line_height = INDEX_FONT_SIZE * 1.6
+    y = height - 30 * mm
+
+    def new_page():
+        nonlocal page_number, y
+        c.setFont(CJK_FONT, 14)
+        c.drawString(LEFT_MARGIN, height - 20 * mm, f"색인 · {title}")
+        c.setFont(CJK_FONT, 10)
+        c.drawRightString(width - LEFT_MARGIN, height - 20 * mm, f"{page_number}쪽")
+        y = height - 32 * mm
+
+    new_page()
+    for level, first_page, last_page, sounds in index:
+        lines = list(_wrap((f"{sound} {page}" for sound, page in sounds),
+                           width - 2 * LEFT_MARGIN))
+        for text in [None] + lines:
+            if y < BOTTOM_Y:
+                _draw_footer(c, width)
+                c.showPage()
+                page_number += 1
+                new_page()
+            if text is None:
+                c.setFont(CJK_FONT, 11)
+                c.drawString(LEFT_MARGIN, y, f"{level}  {first_page}–{last_page}쪽")
+                y -= line_height * 1.2
+            else:
+                c.setFont(CJK_FONT, INDEX_FONT_SIZE)
+                c.drawString(LEFT_MARGIN + 4 * mm, y, text)
+                y -= line_height
+        y -= line_height / 2
+    _draw_footer(c, width)
+    c.showPage()
+    return page_number
+
+
+def render_workbook(path, rows, title, total=None, layout=DEFAULT_LAYOUT, progress=None,
+                    cancel=None, invariant=False, first_page=1):
+    """Render rows (an iterable of row dicts, e.g. a catalog.iter_rows generator) as a workbook.
+
+    Rows are drawn as they arrive and each page is closed as soon as it is
+    full, so apart from reportlab's compressed page streams only one index
+    entry per (grade, reading) run is kept. Each page gets a running head
+    and the workbook ends with an index. Pages are numbered from first_page.
+    progress(done, total, page_number) is called after each character.
+    Returns (characters, pages drawn including the index).
+    """
+    register_cjk_font()
+    c = canvas.Canvas(path, pagesize=A4, invariant=1 if invariant else 0, pageCompression=1)
+    _, grid_form = _grid_form(c, layout)
+    step = (LAYOUTS[layout][1] + 5) * mm
+    per_page = workbook_rows_per_page(layout)
+    top_y = A4[1] - WORKBOOK_TOP
+
+    # [level, first page, last page, [(main_sound, page), ...]] per grade
+    index = []
+    page_number = first_page
+    first = last = None
+    done = 0
+    for hanja in rows:
+        if cancel is not None and cancel.is_set():
+            raise PdfCancelled()
+
+        slot = done % per_page
+        if slot == 0 and done:
+            _draw_running_head(c, title, first, last, page_number)
+            c.showPage()
+            page_number += 1
+        if slot == 0:
+            first = hanja
+        last = hanja
+
+        _draw_entry(c, hanja, top_y - slot * step, grid_form)
+
+        if not index or index[-1][0] != hanja['level']:
+            index.append([hanja['level'], page_number, page_number, []])
+        entry = index[-1]
+        entry[2] = page_number
+        if not entry[3] or entry[3][-1][0] != hanja['main_sound']:
+            entry[3].append((hanja['main_sound'], page_number))
+
+        done += 1
+        if progress:
+            progress(done, total, page_number)
+
+    if done:
+        _draw_running_head(c, title, first, last, page_number)
+        c.showPage()
+        page_number += 1
+    page_number = _draw_index(c, title, index, page_number)
+    c.save()
+    return done, page_number - first_page + 1
+
+
+def sheet_seed(seed, grade, index):
+    """Seed for one sheet of a batch, independent of the other sheets."""
+    return f"{seed}:{grade or '전체'}:{index}"
+
+
+def sheet_filename(grade, index):
+    """File name of one sheet of a batch."""
+    return f"hanja_{grade or '전체'}_{index:03d}.pdf"
+
+
+def build_sheet(catalog, out_dir, grade="", index=1, count=DEFAULT_COUNT,
+                repeat=None, seed=0, date=None, layout=DEFAULT_LAYOUT):
+    """Draw and render one reproducible sheet; return (path, bytes written)."""
+    sampler = Sampler(catalog, sheet_seed(seed, grade, index))
+    hanja_data = sampler.sample(grade, count)
+    path = os.path.join(out_dir, sheet_filename(grade, index))
+    render_worksheet(path, hanja_data, grade, repeat, date=date, invariant=True, layout=layout)
+    return path, os.path.getsize(path)
+
+
+def workbook_title(grades):
+    """Running-head title for a workbook of grades."""
+    named = [grade for grade in grades if grade and grade != "전체"]
+    if not named or len(named) != len(grades):
+        return "한자 쓰기 연습장 · 전체 급수"
+    return "한자 쓰기 연습장 · " + ", ".join(named)
+
+
+def build_workbook(catalog, out_dir, grades=("",), layout=DEFAULT_LAYOUT, volume_pages=None,
+                   progress=None, cancel=None, invariant=False):
+    """Write the workbook of grades, split into volumes of volume_pages pages if set.
+
+    Characters are streamed from catalog.iter_rows, and each volume is a
+    separate file with its own index, so memory stays bounded by one volume
+    however many grades are printed. Page numbers run on across volumes.
+    Returns (list of (path, bytes written), characters, pages).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    title = workbook_title(grades)
+    name = "_".join(grade for grade in grades if grade) or "전체"
+    rows = catalog.iter_rows(grades)
+    total = catalog.count(grades)
+    per_volume = volume_pages * workbook_rows_per_page(layout) if volume_pages else max(total, 1)
+    volumes = max(1, -(-total // per_volume))
+
+    files = []
+    done = pages = 0
+    for volume in range(1, volumes + 1):
+        suffix = f"_{volume:02d}" if volumes > 1 else ""
+        path = os.path.join(out_dir, f"hanja_workbook_{name}{suffix}.pdf")
+        volume_title = f"{title} ({volume}/{volumes}권)" if volumes > 1 else title
+
+        def report(count, _, page_number, base=done):
+            if progress:
+                progress(base + count, total, page_number)
+
+        count, volume_pages_drawn = render_workbook(
+            path, islice(rows, per_volume), volume_title, total, layout,
+            report, cancel, invariant, first_page=pages + 1)
+        done += count
+        pages += volume_pages_drawn
+        files.append((path, os.path.getsize(path)))
+    return files, done, pages
+
+
+def random_worksheet(path, sampler, grade="", count=DEFAULT_COUNT, layout=DEFAULT_LAYOUT,
+                     progress=None, cancel=None):
+    """Draw count hanja of a grade and render them; return False if there were none."""
+    hanja_data = sampler.sample(grade, count)
+    if not hanja_data:
+        return False
+    render_worksheet(path, hanja_data, grade, None, progress, cancel, layout=layout)
+    return True
+
+
+# Per-process state of batch workers
+_worker_catalog = None
+
+
+def _init_worker(db_path):
+    """Load the catalog and register the font once per worker process."""
+    global _worker_catalog
+    _worker_catalog = HanjaCatalog.load(db_path)
+    register_cjk_font()
+
+
+def _build_job(job):
+    """Build one sheet in a worker process."""
+    return build_sheet(_worker_catalog, *job)
+
+
+def build_batch(out_dir, grades=("",), sheets=1, count=DEFAULT_COUNT, repeat=None,
+                seed=0, date=None, workers=None, db_path=DEFAULT_DB_PATH, layout=DEFAULT_LAYOUT):
+    """Build sheets worksheets per grade across a process pool.
+
+    Returns the list of (path, bytes written) in job order.
+    """
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = [(out_dir, grade, index, count, repeat, seed, date, layout)
+            for grade in grades for index in range(1, sheets + 1)]
+    workers = min(workers, len(jobs)) or 1
+    if workers == 1:
+        _init_worker(db_path)
+        return [_build_job(job) for job in jobs]
+    with Pool(workers, initializer=_init_worker, initargs=(db_path,)) as pool:
+        return pool.map(_build_job, jobs, chunksize=max(1, len(jobs) // (workers * 4)))
+
+
+def main():
+    """Build a batch of worksheets and print a throughput summary."""
+    parser = argparse.ArgumentParser(description="한자 쓰기 연습지 일괄 생성")
+    parser.add_argument('--grade', action='append', help="급수 (여러 번 지정 가능, 기본: 전체)")
+    parser.add_argument('--sheets', type=int, default=1, help="급수별 연습지 수")
+    parser.add_argument('--count', type=int, default=DEFAULT_COUNT, help="연습지당 한자 수")
+    parser.add_argument('--repeat', type=int, default=None, help="한자당 쓰기 칸 수 (기본: 레이아웃 값)")
+    parser.add_argument('--layout', choices=list(LAYOUTS), default=DEFAULT_LAYOUT,
+                        help="칸 레이아웃: " + ", ".join(f"{key}={label}" for key, (label, _, _, _) in LAYOUTS.items()))
+    parser.add_argument('--seed', default='0', help="일괄 생성 시드 (같은 시드는 같은 연습지)")
+    parser.add_argument('--date', default=None, help="머리글 날짜 (기본: 오늘)")
+    parser.add_argument('--out', default='worksheets', help="출력 폴더")
+    parser.add_argument('--workers', type=int, default=None, help="작업자 프로세스 수 (기본: CPU 수)")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="데이터베이스 경로")
+    parser.add_argument('--workbook', action='store_true',
+                        help="선택한 급수의 모든 한자를 급수·음 순서로 담은 연습장 생성")
+    parser.add_argument('--volume-pages', type=int, default=None,
+                        help="연습장을 이 쪽수마다 별도 파일(권)로 나눔")
+    args = parser.parse_args()
+
+    grades = [grade if grade != "전체" else "" for grade in args.grade or [""]]
+    if args.workbook:
+        started = time.perf_counter()
+        files, count, pages = build_workbook(HanjaCatalog.load(args.db), args.out, grades,
+                                             args.layout, args.volume_pages)
+        elapsed = time.perf_counter() - started
+        written = sum(size for _, size in files)
+        print(f"연습장 {len(files)}권 생성 완료: {os.path.abspath(args.out)}")
+        print(f"  한자: {count:,}자, {pages:,}쪽 (색인 포함)")
+        print(f"  소요 시간: {elapsed:.3f}초 ({pages / elapsed if elapsed else 0:,.0f}쪽/초)")
+        print(f"  기록 용량: {written:,}바이트")
+        return
+
+    workers = args.workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    results = build_batch(args.out, grades, args.sheets, args.count, args.repeat,
+                          args.seed, args.date, workers, args.db, args.layout)
+    elapsed = time.perf_counter() - started
+
+    written = sum(size for _, size in results)
+    print(f"연습지 {len(results)}장 생성 완료: {os.path.abspath(args.out)}")
+    print(f"\n처리량 (작업자 {min(workers, len(results)) or 1}개):")
+    print(f"  소요 시간: {elapsed:.3f}초")
+    print(f"  연습지/초: {len(results) / elapsed if elapsed else 0:,.1f}")
+    print(f"  기록 용량: {written:,}바이트 ({written / elapsed / 1024 if elapsed else 0:,.0f}KB/초)")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,10 +2,18 @@
 Database initialization script for Hanja Learning Application.
 Creates SQLite database and imports data from hanja.csv.
 """
+import argparse
 import csv
 import os
 import sqlite3
-import ast
+import time
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool
+
+from hanja_core.hangul import search_keys
+from hanja_core.meaning_parser import MeaningParseError, format_meaning, parse_meaning_data
+from hanja_core.review import create_review_tables
 
 # Grade order for sorting
 GRADE_ORDER = {
@@ -24,9 +32,56 @@ DB_PATH = os.environ.get('MAKING_HANJA_DB_PATH',
                          os.path.join(os.path.dirname(__file__), 'making_hanja.sqlite3'))
 CSV_PATH = os.path.join(os.path.dirname(__file__), 'hanja.csv')
 
+# Bulk import settings
+BULK_BATCH_SIZE = 5000
+# Batches queued or being parsed per worker; the CSV is read no further ahead
+BULK_BATCHES_PER_WORKER = 2
+BULK_PRAGMAS = (
+    'PRAGMA journal_mode = MEMORY',
+    'PRAGMA synchronous = OFF',
+    'PRAGMA cache_size = -65536',
+    'PRAGMA temp_store = MEMORY',
+)
+# journal_mode is stored in the file: put back the WAL mode the app's
+# readers and progress writer rely on
+BULK_RESTORE_PRAGMAS = (
+    'PRAGMA journal_mode = WAL',
+)
+
+INSERT_HANJA = '''
+    INSERT INTO hanja (id, main_sound, level, level_order, hanja, meaning, radical, strokes, total_strokes)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+INSERT_MEANING = 'INSERT INTO meaning (hanja_id, group_no, meaning) VALUES (?, ?, ?)'
+INSERT_READING = 'INSERT INTO reading (hanja_id, group_no, sound) VALUES (?, ?, ?)'
+INSERT_SEARCH_KEY = '''
+    INSERT INTO search_key (hanja_id, field, term, choseong, jamo, roman)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+# Parse errors listed in the import summary
+MAX_REPORTED_ERRORS = 5
+
+# Indexes on the imported catalog tables, rebuilt by a bulk import
+CATALOG_INDEXES = (
+    ('idx_hanja_level', 'hanja(level)'),
+    ('idx_hanja_sound', 'hanja(main_sound)'),
+    ('idx_meaning_hanja', 'meaning(hanja_id)'),
+    ('idx_meaning_text', 'meaning(meaning)'),
+    ('idx_reading_hanja', 'reading(hanja_id)'),
+    ('idx_reading_sound', 'reading(sound)'),
+    ('idx_search_key_choseong', 'search_key(choseong)'),
+    ('idx_search_key_jamo', 'search_key(jamo)'),
+    ('idx_search_key_roman', 'search_key(roman)'),
+)
+INDEXES = CATALOG_INDEXES + (
+    ('idx_progress_client', 'progress(client_id)'),
+    ('idx_progress_hanja', 'progress(hanja_id)'),
+)
+
 
-def create_tables(conn):
-    """Create database tables."""
+def create_tables(conn, indexes=True):
+    """Create database tables, and their indexes unless indexes=False."""
     cursor = conn.cursor()
     
     # Hanja table
@@ -44,6 +99,41 @@ def create_tables(conn):
         )
     ''')
     
+    # Normalized meanings and readings, one row per entry of each reading group
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS meaning (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            hanja_id INTEGER NOT NULL,
+            group_no INTEGER NOT NULL,
+            meaning TEXT NOT NULL,
+            FOREIGN KEY (hanja_id) REFERENCES hanja(id)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS reading (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            hanja_id INTEGER NOT NULL,
+            group_no INTEGER NOT NULL,
+            sound TEXT NOT NULL,
+            FOREIGN KEY (hanja_id) REFERENCES hanja(id)
+        )
+    ''')
+    
+    # 초성, jamo and romanized keys of every reading and meaning word, for
+    # prefix search (see hanja_core.hangul)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS search_key (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            hanja_id INTEGER NOT NULL,
+            field TEXT NOT NULL CHECK(field IN ('sound', 'meaning')),
+            term TEXT NOT NULL,
+            choseong TEXT NOT NULL,
+            jamo TEXT NOT NULL,
+            roman TEXT NOT NULL,
+            FOREIGN KEY (hanja_id) REFERENCES hanja(id)
+        )
+    ''')
+    
     # Progress tracking table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS progress (
@@ -56,78 +146,240 @@ def create_tables(conn):
         )
     ''')
     
-    # Indexes
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_hanja_level ON hanja(level)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_hanja_sound ON hanja(main_sound)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_progress_client ON progress(client_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_progress_hanja ON progress(hanja_id)')
+    # Spaced-repetition state materialized from progress
+    create_review_tables(conn)
+    
+    if indexes:
+        create_indexes(conn)
     
     conn.commit()
     print("테이블 생성 완료")
 
 
+def create_indexes(conn):
+    """Create all indexes."""
+    cursor = conn.cursor()
+    for name, target in INDEXES:
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {target}')
+    conn.commit()
+
+
+def drop_indexes(conn):
+    """Drop the catalog indexes so a bulk load does not maintain them row by row."""
+    cursor = conn.cursor()
+    for name, _ in CATALOG_INDEXES:
+        cursor.execute(f'DROP INDEX IF EXISTS {name}')
+    conn.commit()
+
+
 def parse_meaning(meaning_str):
     """Parse meaning string to readable format."""
     try:
-        # The meaning is in format: [[['meaning1', 'meaning2'], ['sound1']], ...]
-        data = ast.literal_eval(meaning_str)
-        parts = []
-        for item in data:
-            meanings = item[0]
-            sounds = item[1] if len(item) > 1 else []
-            meaning_text = ', '.join(meanings)
-            if sounds:
-                sound_text = '/'.join(sounds)
-                parts.append(f"{meaning_text} [{sound_text}]")
-            else:
-                parts.append(meaning_text)
-        return ' | '.join(parts)
-    except (ValueError, SyntaxError, IndexError):
+        return format_meaning(parse_meaning_data(meaning_str))
+    except MeaningParseError:
         return meaning_str
 
 
-def import_csv(conn):
+class ParsedBatch:
+    """Table rows produced from a batch of CSV rows."""
+
+    __slots__ = ('hanja', 'meanings', 'readings', 'keys', 'errors')
+
+    def __init__(self):
+        self.hanja = []
+        self.meanings = []
+        self.readings = []
+        self.keys = []
+        self.errors = []
+
+    def add(self, hanja_id, row):
+        """Parse one CSV row; unparseable meanings are kept verbatim and reported."""
+        level = row['level']
+        try:
+            groups = parse_meaning_data(row['meaning'])
+            meaning = format_meaning(groups)
+        except MeaningParseError as e:
+            groups = ()
+            meaning = row['meaning']
+            # CSV line number: ids start at 1 after the header line
+            self.errors.append((hanja_id + 1, str(e)))
+        self.hanja.append((
+            hanja_id,
+            row['main_sound'],
+            level,
+            GRADE_ORDER.get(level, 99),
+            row['hanja'],
+            meaning,
+            row['radical'],
+            int(row['strokes']) if row['strokes'] else None,
+            int(row['total_strokes']) if row['total_strokes'] else None,
+        ))
+        for group_no, (meanings, sounds) in enumerate(groups):
+            self.meanings.extend((hanja_id, group_no, m) for m in meanings)
+            self.readings.extend((hanja_id, group_no, s) for s in sounds)
+        terms = [('sound', row['main_sound'])]
+        terms += [('sound', s) for _, sounds in groups for s in sounds]
+        terms += [('meaning', m) for meanings, _ in groups for m in meanings]
+        self.keys.extend((hanja_id, field, term, *search_keys(term))
+                         for field, term in dict.fromkeys(terms))
+
+    def insert(self, conn):
+        """Insert the parsed rows."""
+        conn.executemany(INSERT_HANJA, self.hanja)
+        conn.executemany(INSERT_MEANING, self.meanings)
+        conn.executemany(INSERT_READING, self.readings)
+        conn.executemany(INSERT_SEARCH_KEY, self.keys)
+
+
+def parse_batch(batch):
+    """Parse a (first id, CSV rows) batch (runs in a worker process)."""
+    first_id, rows = batch
+    parsed = ParsedBatch()
+    for hanja_id, row in enumerate(rows, first_id):
+        parsed.add(hanja_id, row)
+    return parsed
+
+
+def clear_catalog(conn):
+    """Delete the imported catalog tables."""
+    for table in ('search_key', 'meaning', 'reading', 'hanja'):
+        conn.execute(f'DELETE FROM {table}')
+
+
+def report_errors(errors):
+    """Print a summary of meaning parse errors."""
+    if not errors:
+        return
+    print(f"뜻 파싱 오류 {len(errors)}건 (원문 그대로 저장):")
+    for line_no, message in errors[:MAX_REPORTED_ERRORS]:
+        print(f"  {line_no}행: {message}")
+
+
+def import_csv(conn, csv_path=CSV_PATH):
     """Import hanja data from CSV file."""
     cursor = conn.cursor()
     
     # Clear existing data
-    cursor.execute('DELETE FROM hanja')
+    clear_catalog(conn)
     
-    with open(CSV_PATH, 'r', encoding='utf-8') as f:
+    errors = []
+    with open(csv_path, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
         count = 0
         
         for row in reader:
-            level = row['level']
-            level_order = GRADE_ORDER.get(level, 99)
-            meaning = parse_meaning(row['meaning'])
-            
-            cursor.execute('''
-                INSERT INTO hanja (main_sound, level, level_order, hanja, meaning, radical, strokes, total_strokes)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', [
-                row['main_sound'],
-                level,
-                level_order,
-                row['hanja'],
-                meaning,
-                row['radical'],
-                int(row['strokes']) if row['strokes'] else None,
-                int(row['total_strokes']) if row['total_strokes'] else None
-            ])
             count += 1
+            parsed = ParsedBatch()
+            parsed.add(count, row)
+            cursor.execute(INSERT_HANJA, parsed.hanja[0])
+            cursor.executemany(INSERT_MEANING, parsed.meanings)
+            cursor.executemany(INSERT_READING, parsed.readings)
+            cursor.executemany(INSERT_SEARCH_KEY, parsed.keys)
+            errors.extend(parsed.errors)
             
             if count % 500 == 0:
                 print(f"{count}개 한자 가져오기 완료...")
     
     conn.commit()
     print(f"총 {count}개 한자 데이터 가져오기 완료")
+    report_errors(errors)
+
+
+def read_batches(reader, batch_size):
+    """Yield (first id, rows) batches of up to batch_size CSV rows."""
+    first_id = 1
+    while True:
+        batch = list(islice(reader, batch_size))
+        if not batch:
+            return
+        yield first_id, batch
+        first_id += len(batch)
+
+
+def imap_bounded(pool, func, items, limit):
+    """Like pool.imap, but with at most limit items taken from items and not yet returned.
+
+    Pool.imap's feeder thread reads its whole input ahead; here the next
+    item is only read as a result is handed out.
+    """
+    pending = deque()
+    for item in items:
+        pending.append(pool.apply_async(func, (item,)))
+        if len(pending) >= limit:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+def bulk_import_csv(conn, csv_path=CSV_PATH, batch_size=BULK_BATCH_SIZE, workers=None):
+    """Import hanja data in bulk and print a timing report.
+
+    Rows are streamed from the CSV in batches, parsed in a worker pool and
+    inserted with executemany inside one transaction, with journaling
+    relaxed for the load and indexes built once at the end. Only
+    BULK_BATCHES_PER_WORKER batches per worker are in flight, so memory
+    does not grow with the CSV.
+    """
+    workers = workers or os.cpu_count() or 1
+    timings = {}
+    
+    started = time.perf_counter()
+    for pragma in BULK_PRAGMAS:
+        conn.execute(pragma)
+    drop_indexes(conn)
+    clear_catalog(conn)
+    timings['준비'] = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    count = 0
+    errors = []
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        batches = read_batches(csv.DictReader(f), batch_size)
+        pool = Pool(workers) if workers > 1 else None
+        try:
+            if pool:
+                parsed = imap_bounded(pool, parse_batch, batches, BULK_BATCHES_PER_WORKER * workers)
+            else:
+                parsed = map(parse_batch, batches)
+            for batch in parsed:
+                batch.insert(conn)
+                count += len(batch.hanja)
+                errors.extend(batch.errors)
+                print(f"{count}개 한자 가져오기 완료...")
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+    conn.commit()
+    timings['가져오기'] = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    create_indexes(conn)
+    for pragma in BULK_RESTORE_PRAGMAS:
+        conn.execute(pragma)
+    timings['인덱스 생성'] = time.perf_counter() - started
+    
+    total = sum(timings.values())
+    print(f"총 {count}개 한자 데이터 가져오기 완료")
+    print(f"\n가져오기 시간 (작업자 {workers}개, 배치 {batch_size}행):")
+    for step, seconds in timings.items():
+        print(f"  {step}: {seconds:.3f}초")
+    print(f"  합계: {total:.3f}초 ({count / total if total else 0:,.0f}행/초)")
+    report_errors(errors)
+    return count
 
 
 def main():
     """Initialize database."""
+    parser = argparse.ArgumentParser(description="한자 데이터베이스 초기화")
+    parser.add_argument('--csv', default=CSV_PATH, help="가져올 CSV 파일 경로")
+    parser.add_argument('--bulk', action='store_true', help="대용량 CSV용 일괄 가져오기 모드")
+    parser.add_argument('--batch-size', type=int, default=BULK_BATCH_SIZE, help="일괄 가져오기 배치 크기")
+    parser.add_argument('--workers', type=int, default=None, help="파싱 작업자 프로세스 수 (기본: CPU 수)")
+    args = parser.parse_args()
+    
     print(f"데이터베이스 경로: {DB_PATH}")
-    print(f"CSV 파일 경로: {CSV_PATH}")
+    print(f"CSV 파일 경로: {args.csv}")
     
     # Create database directory if needed
     os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
@@ -135,8 +387,12 @@ def main():
     conn = sqlite3.connect(DB_PATH)
     
     try:
-        create_tables(conn)
-        import_csv(conn)
+        if args.bulk:
+            create_tables(conn, indexes=False)
+            bulk_import_csv(conn, args.csv, args.batch_size, args.workers)
+        else:
+            create_tables(conn)
+            import_csv(conn, args.csv)
         
         # Verify
         cursor = conn.cursor()
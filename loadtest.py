@@ -0,0 +1,226 @@
+"""
+Load test for the web mode (`python desktop_app.py --web`).
+
+    python loadtest.py --sessions 300 --workers 64
+
+Simulates browser sessions the way the Flet server runs them: main(page)
+once per session on a pool of worker threads, all sharing the process's
+StudyEngine. Each session connects with its own client storage (so its own
+learner id), searches and pages the list, grades a flashcard deck and
+answers a quiz. Pages are stand-ins, so no browser or display is needed.
+The report lists latency per action (p50/p95/max), throughput, memory and
+how many copies of the shared catalog tables exist at the end (one each).
+Answers are written to a copy of the database.
+"""
+import argparse
+import gc
+import os
+import random
+import resource
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import flet as ft
+
+import desktop_app
+from hanja_core import HanjaCatalog, QuizPools, StudyEngine
+from hanja_core.connections import DEFAULT_DB_PATH
+
+DEFAULT_SESSIONS = 300
+DEFAULT_WORKERS = 64
+
+# Inputs a simulated learner types or picks
+QUERIES = ("물", "수", "일", "산", "大", "사람", "학")
+GRADES = ("8급", "7급", "6급", "5급", "4급", "3급")
+LIST_PAGES = 3
+FLASHCARDS = 10
+QUIZ_QUESTIONS = 10
+
+
+class _Event:
+    """The parts of a Flet event the handlers read."""
+
+    def __init__(self, control):
+        self.control = control
+        self.data = None
+
+
+def _walk(control):
+    yield control
+    for attr in ('content', 'controls'):
+        child = getattr(control, attr, None)
+        if isinstance(child, list):
+            for item in child:
+                yield from _walk(item)
+        elif isinstance(child, ft.Control):
+            yield from _walk(child)
+
+
+class SimulatedSession:
+    """One browser: a stand-in page driven through the app's own handlers."""
+
+    def __init__(self, rng, latencies, think):
+        self.rng = rng
+        self.latencies = latencies
+        self.think = think
+        self.storage = {}
+        self.page = mock.MagicMock()
+        self.page.web = True
+        self.page.client_storage.get.side_effect = self.storage.get
+        self.page.client_storage.set.side_effect = self.storage.__setitem__
+        self.content = None
+        self.nav = None
+
+    def timed(self, action, func, *args):
+        if self.think:
+            time.sleep(self.rng.uniform(0, self.think))
+        started = time.perf_counter()
+        func(*args)
+        self.latencies.setdefault(action, []).append((time.perf_counter() - started) * 1000)
+
+    def click(self, control):
+        control.on_click(_Event(control))
+
+    def find(self, predicate):
+        return [c for c in _walk(self.content.content) if predicate(c)]
+
+    def button(self, text):
+        return self.find(lambda c: getattr(c, 'text', None) == text
+                         and getattr(c, 'on_click', None) and c.visible is not False)[0]
+
+    def connect(self):
+        desktop_app.main(self.page)
+        column = self.page.add.call_args[0][0]
+        self.content = column.controls[1]
+        self.nav = {b.text: b for b in column.controls[0].content.controls[1].controls}
+
+    def open(self, label):
+        self.click(self.nav[label])
+
+    def browse_list(self):
+        self.timed('list.open', self.open, "한자 목록")
+        search = self.find(lambda c: isinstance(c, ft.TextField) and c.label == "검색")[0]
+        search.value = self.rng.choice(QUERIES)
+        self.timed('list.search', search.on_submit, _Event(search))
+        search.value = ""
+        self.timed('list.search', search.on_submit, _Event(search))
+        grade = self.find(lambda c: isinstance(c, ft.Dropdown) and c.label == "급수 선택")[0]
+        grade.value = self.rng.choice(GRADES)
+        self.timed('list.grade', grade.on_change, _Event(grade))
+        next_button = self.find(lambda c: isinstance(c, ft.IconButton)
+                                and c.icon == ft.Icons.ARROW_FORWARD)[0]
+        for _ in range(LIST_PAGES):
+            self.timed('list.next_page', self.click, next_button)
+
+    def study_flashcards(self):
+        self.timed('flashcard.open', self.open, "플래시카드")
+        self.timed('flashcard.start', self.click, self.button("시작"))
+        for _ in range(FLASHCARDS):
+            self.timed('flashcard.grade', self.click,
+                       self.button("알아요" if self.rng.random() < 0.7 else "몰라요"))
+
+    def take_quiz(self):
+        self.timed('quiz.open', self.open, "퀴즈")
+        self.timed('quiz.start', self.click, self.button("시작"))
+        for _ in range(QUIZ_QUESTIONS):
+            options = self.find(lambda c: isinstance(c, ft.ElevatedButton) and c.data
+                                and c.visible is not False)
+            self.timed('quiz.answer', self.click, self.rng.choice(options))
+            self.timed('quiz.next', self.click, self.button("다음 문제"))
+
+    def run(self):
+        self.timed('connect', self.connect)
+        self.browse_list()
+        self.study_flashcards()
+        self.take_quiz()
+        return self.storage[desktop_app.WEB_CLIENT_KEY]
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _rss_mib():
+    """Peak resident set size of this process."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(sessions, workers, think, db_path, seed):
+    """Run the sessions concurrently against a fresh engine; print the report."""
+    engine = desktop_app.engine = StudyEngine(db_path)
+    # Built before the first session, as serve() does
+    engine.quiz_pools
+    baseline_rss = _rss_mib()
+    # One latency dict per session, merged at the end, so workers never share one
+    latencies = [{} for _ in range(sessions)]
+    rngs = [random.Random(f"{seed}:{i}") for i in range(sessions)]
+
+    def simulate(i):
+        return SimulatedSession(rngs[i], latencies[i], think).run()
+
+    started = time.perf_counter()
+    # Detached stand-in controls cannot send updates
+    with mock.patch.object(ft.Control, 'update'), ThreadPoolExecutor(workers) as pool:
+        client_ids = list(pool.map(simulate, range(sessions)))
+    elapsed = time.perf_counter() - started
+    engine.scheduler(client_ids[0]).flush()
+
+    merged = {}
+    for session in latencies:
+        for action, times in session.items():
+            merged.setdefault(action, []).extend(times)
+    actions = sum(len(times) for times in merged.values())
+    print(f"\n세션 {sessions}개 (작업자 스레드 {workers}개): {elapsed:.2f}초, "
+          f"{sessions / elapsed:.1f}세션/초, {actions / elapsed:,.0f}동작/초")
+    print("\n동작별 응답 시간 (ms):")
+    print(f"  {'동작':<18}{'횟수':>8}{'p50':>10}{'p95':>10}{'최대':>10}")
+    for action, times in merged.items():
+        ordered = sorted(times)
+        print(f"  {action:<18}{len(ordered):>8}{statistics.median(ordered):>10.2f}"
+              f"{_percentile(ordered, 0.95):>10.2f}{ordered[-1]:>10.2f}")
+
+    gc.collect()
+    objects = gc.get_objects()
+    catalogs = sum(isinstance(o, HanjaCatalog) for o in objects)
+    pools = sum(isinstance(o, QuizPools) for o in objects)
+    rss = _rss_mib()
+    conn = engine.connections.read()
+    recorded = conn.execute(
+        "SELECT COUNT(DISTINCT client_id), COUNT(*) FROM progress WHERE client_id LIKE 'web-%'"
+    ).fetchone()
+    print(f"\n공유 데이터: 카탈로그 {catalogs}개, 퀴즈 풀 {pools}개, "
+          f"스레드 {threading.active_count()}개")
+    print(f"메모리(최대 RSS): 시작 {baseline_rss:.0f}MiB → 종료 {rss:.0f}MiB "
+          f"(세션당 {(rss - baseline_rss) * 1024 / sessions:.0f}KiB)")
+    print(f"학습 기록: 학습자 {recorded[0]}명, 답안 {recorded[1]:,}건 (학습자 ID {len(set(client_ids))}개)")
+    engine.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="웹 모드 부하 테스트")
+    parser.add_argument('--sessions', type=int, default=DEFAULT_SESSIONS, help="동시 세션 수")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help="세션을 실행할 작업자 스레드 수")
+    parser.add_argument('--think', type=float, default=0.0,
+                        help="동작 사이 최대 대기 시간 (초, 0 = 쉬지 않음)")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="복사해서 쓸 데이터베이스")
+    parser.add_argument('--seed', default="loadtest", help="세션 동작 난수 시드")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='hanja-load-') as work_dir:
+        db_path = os.path.join(work_dir, os.path.basename(args.db))
+        # The backup API includes what is still in the source's WAL file
+        with sqlite3.connect(args.db) as src, sqlite3.connect(db_path) as dest:
+            src.backup(dest)
+        run(args.sessions, args.workers, args.think, db_path, args.seed)
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Startup profiler for `python desktop_app.py --profile-startup`.
+Imported before anything else in desktop_app.py so it can time the imports
+that follow. When the flag is absent every function is a no-op.
+"""
+import builtins
+import sys
+import time
+
+ENABLED = '--profile-startup' in sys.argv
+STARTED = time.perf_counter()
+
+# Number of imports listed in the report
+TOP_IMPORTS = 15
+
+_marks = []
+_import_times = {}
+_depth = 0
+_original_import = builtins.__import__
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    """Time top-level imports of modules that are not loaded yet."""
+    global _depth
+    if _depth or level or name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+    _depth += 1
+    started = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        _depth -= 1
+        _import_times[name] = _import_times.get(name, 0.0) + time.perf_counter() - started
+
+
+def mark(label):
+    """Record the time since startup under a label."""
+    if ENABLED:
+        _marks.append((label, time.perf_counter() - STARTED))
+
+
+def report():
+    """Print the recorded marks and the most expensive imports."""
+    if not ENABLED:
+        return
+    builtins.__import__ = _original_import
+    print("\n시작 프로파일 (desktop_app 로드 시점 기준):")
+    for label, seconds in _marks:
+        print(f"  {label}: {seconds * 1000:.1f}ms")
+    print(f"\n가져오기 비용 (상위 {TOP_IMPORTS}개, 하위 모듈 포함):")
+    ranked = sorted(_import_times.items(), key=lambda item: item[1], reverse=True)
+    for name, seconds in ranked[:TOP_IMPORTS]:
+        print(f"  {name}: {seconds * 1000:.1f}ms")
+    sys.stdout.flush()
+
+
+if ENABLED:
+    builtins.__import__ = _timed_import
@@ -0,0 +1,22 @@
+"""Shared fixtures."""
+import contextlib
+import io
+import sqlite3
+
+import pytest
+
+from hanja_core import HanjaCatalog
+from init_db import create_tables, import_csv
+
+
+@pytest.fixture(scope='session')
+def catalog(tmp_path_factory):
+    """The catalog of hanja.csv, imported into a scratch database."""
+    conn = sqlite3.connect(str(tmp_path_factory.mktemp("catalog") / "catalog.sqlite3"))
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            create_tables(conn)
+            import_csv(conn)
+        return HanjaCatalog.from_connection(conn)
+    finally:
+        conn.close()
@@ -0,0 +1,62 @@
+"""초성, jamo and romanized search keys."""
+import pytest
+
+from hanja_core import hangul
+
+
+@pytest.mark.parametrize("term, keys", [
+    ("사람", ("ㅅㄹ", "ㅅㅏㄹㅏㅁ", "saram")),
+    ("물", ("ㅁ", "ㅁㅜㄹ", "mul")),
+    ("꽃", ("ㄲ", "ㄲㅗㅊ", "kkot")),
+    ("과일", ("ㄱㅇ", "ㄱㅗㅏㅇㅣㄹ", "gwail")),
+    ("닭", ("ㄷ", "ㄷㅏㄹㄱ", "dak")),
+    ("의", ("ㅇ", "ㅇㅡㅣ", "ui")),
+    ("가운데", ("ㄱㅇㄷ", "ㄱㅏㅇㅜㄴㄷㅔ", "gaunde")),
+])
+def test_search_keys(term, keys):
+    assert hangul.search_keys(term) == keys
+
+
+def test_half_typed_syllable_is_a_jamo_prefix():
+    assert hangul.jamo("과일").startswith(hangul.jamo("고"))
+    assert hangul.jamo("무릎").startswith(hangul.jamo("무ㄹ"))
+
+
+@pytest.mark.parametrize("query, lookup", [
+    ("ㄱㅇ", ('choseong', "ㄱㅇ")),
+    ("무ㄹ", ('jamo', "ㅁㅜㄹ")),
+    ("ㅘ", ('jamo', "ㅗㅏ")),
+    ("Mul", ('roman', "mul")),
+    ("ga un", ('roman', "gaun")),
+    ("물", None),
+    ("水", None),
+    ("mul1", None),
+    ("", None),
+])
+def test_query_key(query, lookup):
+    assert hangul.query_key(query) == lookup
+
+
+def test_prefix_index_matches_a_scan():
+    words = ["가", "가운데", "강", "나무", "", "가"]
+    index = hangul.PrefixIndex((hangul.jamo(word), pos) for pos, word in enumerate(words))
+    for prefix in ("ㄱ", "ㄱㅏ", "ㄱㅏㅇ", "ㄴ", "ㅎ"):
+        expected = sorted(pos for pos, word in enumerate(words)
+                          if word and hangul.jamo(word).startswith(prefix))
+        assert sorted(index.search(prefix)) == expected
+
+
+@pytest.mark.parametrize("query", ["ㄱㅇ", "ㅅ", "무ㄹ", "mul", "san"])
+def test_catalog_prefix_search_matches_brute_force(catalog, query):
+    kind, key = hangul.query_key(query)
+    index = hangul.KEY_KINDS.index(kind)
+
+    def matches(terms):
+        return any(hangul.search_keys(term)[index].startswith(key) for term in terms)
+
+    by_reading = [pos for pos in range(len(catalog)) if matches(catalog.readings(pos))]
+    by_meaning = [pos for pos in range(len(catalog))
+                  if pos not in set(by_reading) and matches(catalog.senses(pos))]
+    ids = [row['id'] for row in catalog.results("", query).rows(0, len(catalog))]
+    assert ids == [catalog.ids[pos] for pos in by_reading + by_meaning]
+    assert ids
@@ -0,0 +1,20 @@
+"""Bulk import helpers."""
+from multiprocessing import Pool
+
+from init_db import imap_bounded
+
+
+def test_imap_bounded_reads_input_lazily():
+    consumed = []
+
+    def items():
+        for i in range(100):
+            consumed.append(i)
+            yield -i
+
+    with Pool(2) as pool:
+        results = imap_bounded(pool, abs, items(), 4)
+        assert next(results) == 0
+        assert len(consumed) == 4
+        assert list(results) == list(range(1, 100))
+    assert len(consumed) == 100
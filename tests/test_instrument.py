@@ -0,0 +1,43 @@
+"""Timing decorator."""
+import asyncio
+import inspect
+
+import pytest
+
+from hanja_core import instrument
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(instrument, 'ENABLED', True)
+    instrument.reset()
+    yield
+    instrument.reset()
+
+
+def test_async_handler_stays_a_coroutine_function(enabled):
+    async def on_search_change(e):
+        await asyncio.sleep(0)
+        return e
+
+    wrapped = instrument.timed('handler', 'list.on_change[검색]')(on_search_change)
+    assert inspect.iscoroutinefunction(wrapped)
+    assert asyncio.run(wrapped("물")) == "물"
+    stats = instrument.snapshot()['operations']['handler']['list.on_change[검색]']
+    assert stats['count'] == 1
+
+
+def test_sync_function_is_timed(enabled):
+    wrapped = instrument.timed('view')(lambda: 42)
+    assert not inspect.iscoroutinefunction(wrapped)
+    assert wrapped() == 42
+    assert instrument.snapshot()['operations']['view']['<lambda>']['count'] == 1
+
+
+def test_disabled_returns_function_unchanged(monkeypatch):
+    monkeypatch.setattr(instrument, 'ENABLED', False)
+
+    def handler(e):
+        return e
+
+    assert instrument.timed('handler')(handler) is handler
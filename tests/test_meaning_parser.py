@@ -0,0 +1,56 @@
+"""Meaning field parsing."""
+import ast
+import csv
+import pathlib
+
+import pytest
+
+from hanja_core.meaning_parser import (MeaningParseError, _groups, format_meaning,
+                                       parse_meaning_data, split_display)
+
+CSV_PATH = pathlib.Path(__file__).resolve().parent.parent / "hanja.csv"
+
+
+def test_groups_with_and_without_sounds():
+    assert parse_meaning_data("[[['초'], ['초']], [['술권할'], ['작']]]") == (
+        (('초',), ('초',)), (('술권할',), ('작',)))
+    assert parse_meaning_data('[[["집", "가옥"]]]') == ((('집', '가옥'), ()),)
+    assert parse_meaning_data("[]") == ()
+
+
+def test_escapes_fall_back_to_literal_eval():
+    assert parse_meaning_data(r"[[['it\'s'], ['가']]]") == ((("it's",), ('가',)),)
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "[[['집'], ['가']]",
+    "[[['집'], ['가']]]]",
+    "[[['집'] ['가']]]",
+    "[[['집'],, ['가']]]",
+    "[[['집'], ['가']]] []",
+    "[[['집'], ['가'], ['더']]]",
+    "[[[1], ['가']]]",
+    "['집']",
+    "{'집': '가'}",
+    "[[['집'], ['가']]] + x",
+])
+def test_malformed_fields_raise(text):
+    with pytest.raises(MeaningParseError) as info:
+        parse_meaning_data(text)
+    assert info.value.text == text
+    assert isinstance(info.value, ValueError)
+
+
+def test_matches_literal_eval_on_every_csv_row():
+    with open(CSV_PATH, encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            text = row['meaning']
+            assert parse_meaning_data(text) == _groups(ast.literal_eval(text), text)
+
+
+def test_display_round_trip():
+    groups = ((('초', '술'), ('초',)), (('술권할',), ('작', '잔')), (('집',), ()))
+    display = format_meaning(groups)
+    assert display == "초, 술 [초] | 술권할 [작/잔] | 집"
+    assert split_display(display) == groups
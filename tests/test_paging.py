@@ -0,0 +1,68 @@
+"""Keyset paging over result sets."""
+import pytest
+
+from hanja_core import ListSession
+
+FILTERS = [
+    dict(grade=""),
+    dict(grade="5급"),
+    dict(grade="", query="물"),
+    dict(grade="", query="大"),
+    dict(grade="3급", query="ㅅ"),
+    dict(grade="", radical="水"),
+    dict(grade="4급", total_strokes=9),
+]
+
+
+def ids(rows):
+    return [row['id'] for row in rows]
+
+
+@pytest.mark.parametrize("where", FILTERS)
+def test_pages_forward_and_back_cover_the_result(catalog, where):
+    session = ListSession(catalog, per_page=17)
+    session.radical = where.get('radical', "")
+    session.total_strokes = where.get('total_strokes')
+    session.load(where['grade'], where.get('query', ""))
+    results = session.results
+    expected = ids(results.rows(0, len(results)))
+    assert expected
+
+    pages = [ids(session.rows)]
+    while session.next_page():
+        pages.append(ids(session.rows))
+    assert [hanja_id for page in pages for hanja_id in page] == expected
+    assert len(pages) == session.total_pages
+
+    back = [ids(session.rows)]
+    while session.prev_page():
+        back.append(ids(session.rows))
+    assert back[::-1] == pages
+    assert session.page_num == 1
+
+
+@pytest.mark.parametrize("where", FILTERS)
+def test_seek_finds_every_cursor(catalog, where):
+    results = catalog.results(where['grade'], where.get('query', ""),
+                              where.get('radical', ""), where.get('total_strokes'))
+    for offset in range(len(results)):
+        cursor = results.key(offset)
+        assert results.seek(cursor, after=False) == offset
+        assert results.seek(cursor) == offset + 1
+
+
+@pytest.mark.parametrize("where", FILTERS)
+def test_preview_is_the_first_page(catalog, where):
+    args = (where['grade'], where.get('query', ""))
+    browse = (where.get('radical', ""), where.get('total_strokes'))
+    preview = catalog.preview(*args, 20, *browse)
+    assert ids(preview) == ids(catalog.results(*args, *browse).rows(0, 20))
+
+
+@pytest.mark.parametrize("query", ["물", "大", "나무", "일"])
+def test_substring_search_matches_a_scan(catalog, query):
+    found = {row['id'] for row in catalog.results("", query).rows(0, len(catalog))}
+    expected = {catalog.ids[pos] for pos in range(len(catalog))
+                if query in catalog.hanja[pos] or query in catalog.meaning[pos]
+                or any(query in sound for sound in catalog.readings(pos))}
+    assert found == expected
@@ -0,0 +1,109 @@
+"""Compaction of the answer log."""
+import contextlib
+import io
+import sqlite3
+from datetime import timedelta
+
+import pytest
+
+from hanja_core import ConnectionManager, ReviewScheduler, review
+from hanja_core.review import TIME_FORMAT, utc_now
+from init_db import create_tables
+
+
+@pytest.fixture
+def connections(tmp_path):
+    db_path = str(tmp_path / "review.sqlite3")
+    conn = sqlite3.connect(db_path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        create_tables(conn)
+    conn.executemany(
+        'INSERT INTO hanja (id, main_sound, level, level_order, hanja, meaning) '
+        'VALUES (?, ?, ?, ?, ?, ?)',
+        [(1, "일", "8급", 1, "一", "한 일"), (2, "이", "8급", 1, "二", "두 이")])
+    conn.commit()
+    conn.close()
+    manager = ConnectionManager(db_path)
+    yield manager
+    manager.close()
+
+
+def log_answers(conn, client_id, answers, when):
+    """Append answers to progress directly, as an app without rollups did."""
+    stamp = when.strftime(TIME_FORMAT)
+    with conn:
+        conn.executemany(
+            'INSERT INTO progress (client_id, hanja_id, result, created_at) VALUES (?, ?, ?, ?)',
+            [(client_id, hanja_id, result, stamp) for hanja_id, result in answers])
+
+
+def test_compact_keeps_every_clients_answers(connections):
+    now = utc_now()
+    old = now - timedelta(days=200)
+    conn = connections.writer()
+    log_answers(conn, 'first', [(1, 'correct'), (2, 'incorrect')], old)
+    log_answers(conn, 'second', [(1, 'correct'), (1, 'correct'), (2, 'incorrect')], old)
+
+    # Only the first learner's scheduler folds its log in before compacting
+    scheduler = ReviewScheduler(connections, 'first')
+    try:
+        assert scheduler.compact(90, now) == 5
+    finally:
+        scheduler.close()
+
+    assert conn.execute('SELECT COUNT(*) FROM progress').fetchone()[0] == 0
+    rollups = dict(((client, level), (correct, incorrect)) for client, level, correct, incorrect
+                   in conn.execute('SELECT client_id, level, correct, incorrect FROM progress_daily'))
+    assert rollups == {('first', '8급'): (1, 1), ('second', '8급'): (2, 1)}
+    states = dict(((client, hanja_id), repetitions) for client, hanja_id, repetitions
+                  in conn.execute('SELECT client_id, hanja_id, repetitions FROM review_state'))
+    assert states == {('first', 1): 1, ('first', 2): 0, ('second', 1): 2, ('second', 2): 0}
+
+
+def test_compact_does_not_recount_folded_answers(connections):
+    now = utc_now()
+    conn = connections.writer()
+    log_answers(conn, 'first', [(1, 'correct')], now - timedelta(days=200))
+    scheduler = ReviewScheduler(connections, 'first')
+    try:
+        scheduler.record(2, False, now - timedelta(days=100))
+        scheduler.compact(90, now)
+        scheduler.compact(90, now)
+        assert scheduler.level_stats(365, now) == [('8급', 1, 1)]
+    finally:
+        scheduler.close()
+
+
+def test_weights_favour_missed_hanja(connections):
+    scheduler = ReviewScheduler(connections, 'first')
+    try:
+        now = utc_now()
+        scheduler.record(1, True, now)
+        scheduler.record(2, False, now)
+        scheduler.record(2, False, now)
+        weights = scheduler.weights()
+    finally:
+        scheduler.close()
+    assert weights[1] == pytest.approx(1.0)
+    assert weights[2] > 2.0
+
+
+def test_answers_survive_a_locked_database(connections, monkeypatch, capsys):
+    monkeypatch.setattr(review, 'WRITE_RETRIES', 1)
+    monkeypatch.setattr(review, 'WRITE_BACKOFF', 0.01)
+    connections.writer().execute('PRAGMA busy_timeout = 0')
+    scheduler = ReviewScheduler(connections, 'first')
+    other = sqlite3.connect(connections.db_path)
+    try:
+        other.execute('BEGIN IMMEDIATE')
+        scheduler.record(1, True)
+        scheduler.flush()
+        assert 'locked' in capsys.readouterr().err
+        other.rollback()
+        scheduler.flush()
+    finally:
+        other.close()
+        scheduler.close()
+    conn = connections.writer()
+    assert conn.execute('SELECT COUNT(*) FROM progress').fetchone()[0] == 1
+    assert conn.execute('SELECT COUNT(*) FROM review_state').fetchone()[0] == 1
@@ -0,0 +1,33 @@
+"""Uniform and weighted draws."""
+from collections import Counter
+
+from hanja_core import HanjaCatalog, Sampler
+
+ROWS = [(hanja_id, chr(0x4E00 + hanja_id), "음", "뜻 음", "8급", 1, "一", 0, 1)
+        for hanja_id in range(1, 11)]
+
+
+def test_uniform_draws_are_distinct_and_capped():
+    sampler = Sampler(HanjaCatalog(ROWS), 0)
+    positions = sampler.sample_positions("8급", 20)
+    assert sorted(positions) == list(range(len(ROWS)))
+    assert sampler.sample_positions("1급", 5) == []
+
+
+def test_weighted_draws_favour_heavy_ids_and_skip_zero():
+    sampler = Sampler(HanjaCatalog(ROWS), 0)
+    weights = {1: 10.0, 2: 0}
+    drawn = Counter()
+    for _ in range(500):
+        rows = sampler.sample("8급", 3, weights)
+        assert len({row['id'] for row in rows}) == 3
+        drawn.update(row['id'] for row in rows)
+    assert drawn[2] == 0
+    assert drawn[1] > 2 * max(count for hanja_id, count in drawn.items() if hanja_id != 1)
+
+
+def test_weighted_draws_are_reproducible():
+    catalog = HanjaCatalog(ROWS)
+    weights = {3: 4.0}
+    assert (Sampler(catalog, 7).sample_positions("", 4, weights)
+            == Sampler(catalog, 7).sample_positions("", 4, weights))
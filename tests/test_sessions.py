@@ -0,0 +1,104 @@
+"""Flashcard and quiz sessions."""
+from types import SimpleNamespace
+
+from hanja_core import FlashcardSession, HanjaCatalog, Question, QuizSession, Sampler
+
+ROWS = [
+    (1, "一", "일", "한 일", "8급", 1, "一", 0, 1),
+    (2, "二", "이", "두 이", "8급", 1, "二", 0, 2),
+    (3, "三", "삼", "석 삼", "8급", 1, "一", 2, 3),
+]
+
+
+class RecordingScheduler:
+    def __init__(self):
+        self.answers = []
+
+    def record(self, hanja_id, correct):
+        self.answers.append((hanja_id, correct))
+
+    def weights(self):
+        return {}
+
+
+def make_session():
+    builder = SimpleNamespace(sampler=Sampler(HanjaCatalog(ROWS), 0))
+    scheduler = RecordingScheduler()
+    session = FlashcardSession(builder, scheduler)
+    assert session.start("", count=len(ROWS))
+    return session, scheduler
+
+
+def test_last_card_is_recorded_once():
+    session, scheduler = make_session()
+    assert session.grade(True)
+    assert session.grade(False)
+    assert not session.grade(True)
+    # Clicks on the finished deck's last card record nothing more
+    assert not session.grade(True)
+    assert not session.grade(False)
+    assert len(scheduler.answers) == len(ROWS)
+    assert session.is_graded
+
+
+def test_revisited_card_is_not_regraded():
+    session, scheduler = make_session()
+    first = session.current['id']
+    session.grade(False)
+    session.move(-1)
+    assert session.is_graded
+    session.grade(True)
+    assert scheduler.answers == [(first, False)]
+    assert session.index == 1 and not session.is_graded
+
+
+def test_new_deck_can_be_graded_again():
+    session, scheduler = make_session()
+    for _ in ROWS:
+        session.grade(True)
+    session.start("", count=len(ROWS))
+    assert not session.is_graded
+    session.grade(True)
+    assert len(scheduler.answers) == len(ROWS) + 1
+
+
+def make_quiz():
+    questions = [Question(hanja_id, hanja, hanja, meaning, [meaning, "다른 뜻"])
+                 for hanja_id, hanja, _, meaning, *_ in ROWS]
+    builder = SimpleNamespace(build=lambda grade, count, mode, option_count, weights=None: questions[:count])
+    scheduler = RecordingScheduler()
+    quiz = QuizSession(builder, scheduler)
+    assert quiz.start("", count=len(ROWS))
+    return quiz, scheduler
+
+
+def test_question_is_answered_once():
+    quiz, scheduler = make_quiz()
+    answer = quiz.current.answer
+    assert quiz.answer(answer)
+    # A double click: the second answer neither scores nor records
+    assert quiz.answer(answer)
+    assert quiz.answer("다른 뜻")
+    assert quiz.score == 1
+    assert scheduler.answers == [(1, True)]
+
+
+def test_next_needs_an_answer():
+    quiz, scheduler = make_quiz()
+    assert not quiz.next()
+    quiz.answer("다른 뜻")
+    assert quiz.next()
+    assert not quiz.next()
+    assert quiz.index == 1
+
+
+def test_answers_after_the_quiz_are_ignored():
+    quiz, scheduler = make_quiz()
+    for _ in ROWS:
+        quiz.answer(quiz.current.answer)
+        quiz.next()
+    assert quiz.finished
+    assert quiz.answer("한 일") is None
+    assert not quiz.next()
+    assert quiz.score == len(ROWS)
+    assert len(scheduler.answers) == len(ROWS)